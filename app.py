@@ -2,14 +2,18 @@ import tkinter as tk
 from tkinter import messagebox
 import os
 import sys
+import ctypes
 import threading
 import time
 from PIL import Image, ImageDraw
 import pystray
 import argparse
-from datetime import datetime
+from datetime import datetime, timezone
 import tempfile
 import atexit
+import heapq
+from collections import defaultdict
+from multiprocessing.connection import Listener, Client
 
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
@@ -20,51 +24,44 @@ class SingleInstanceChecker:
     def __init__(self, unique_id="inveni_file_manager_lock"):
         """Initialize with a unique ID for this application."""
         self.unique_id = unique_id
-        self.lockfile = os.path.join(tempfile.gettempdir(), f"{self.unique_id}.lock")
+        temp_dir = tempfile.gettempdir()
+        self.lockfile = os.path.join(temp_dir, f"{self.unique_id}.lock")
         self.lockfd = None
         
+        # IPC endpoint used to signal the running instance (named pipe on Windows, Unix socket elsewhere)
+        if sys.platform == 'win32':
+            self.ipc_path = rf"\\.\pipe\{self.unique_id}"
+        else:
+            self.ipc_path = os.path.join(temp_dir, f"{self.unique_id}.sock")
+        self.listener = None
+        
     def is_another_instance_running(self):
         """Check if another instance is already running using file locking."""
         try:
-            # If lock file exists but is stale (contains a PID that no longer exists)
-            if os.path.exists(self.lockfile):
-                with open(self.lockfile, 'r') as f:
-                    old_pid = f.read().strip()
-                    try:
-                        # Check if process with this PID exists
-                        old_pid = int(old_pid)
-                        # Windows-specific process check
-                        if sys.platform == 'win32':
-                            import ctypes
-                            kernel32 = ctypes.windll.kernel32
-                            handle = kernel32.OpenProcess(1, 0, old_pid)
-                            if handle == 0:
-                                # Process doesn't exist, remove stale lock
-                                os.remove(self.lockfile)
-                            else:
-                                kernel32.CloseHandle(handle)
-                                # Try to signal the other instance
-                                self._signal_existing_instance()
-                                return True
-                        # Unix process check
-                        else:
-                            import signal
-                            os.kill(old_pid, 0)  # This raises OSError if process doesn't exist
-                            # Process exists, try to signal it
-                            self._signal_existing_instance()
-                            return True
-                    except (ValueError, OSError):
-                        # Invalid PID or process doesn't exist, remove stale lock
-                        os.remove(self.lockfile)
-            
-            # Create lock file with current PID
-            with open(self.lockfile, 'w') as f:
-                f.write(str(os.getpid()))
+            # Keep the descriptor open for the lifetime of the process; the lock goes with it
+            self.lockfd = os.open(self.lockfile, os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                if sys.platform == 'win32':
+                    import msvcrt
+                    msvcrt.locking(self.lockfd, msvcrt.LK_NBLCK, 1)
+                else:
+                    import fcntl
+                    fcntl.flock(self.lockfd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # Lock is held by a running instance, try to signal it
+                os.close(self.lockfd)
+                self.lockfd = None
+                self._signal_existing_instance()
+                return True
+            
+            # Record current PID for diagnostics only (fixed-width little-endian, no text round-trip)
+            os.ftruncate(self.lockfd, 0)
+            os.write(self.lockfd, os.getpid().to_bytes(8, 'little'))
             
             # Register cleanup on exit
             atexit.register(self._cleanup)
             
-            # Successfully created lock, no other instance is running
+            # Successfully acquired lock, no other instance is running
             return False
             
         except Exception as e:
@@ -75,60 +72,80 @@ class SingleInstanceChecker:
     def _signal_existing_instance(self):
         """Signal the existing instance to show its window."""
         try:
-            # Create signal file
-            signal_file = os.path.join(tempfile.gettempdir(), f"{self.unique_id}.signal")
-            with open(signal_file, 'w') as f:
-                f.write(f"SHOW_WINDOW|{os.getpid()}|{time.time()}")
-            print(f"Signal file created at: {signal_file}")
+            with Client(self.ipc_path) as conn:
+                conn.send_bytes(f"SHOW_WINDOW|{os.getpid()}".encode('utf-8'))
+            print(f"Signal sent to existing instance via: {self.ipc_path}")
             return True
         except Exception as e:
             print(f"Error signaling existing instance: {e}")
             return False
     
     def _cleanup(self):
-        """Clean up the lock file on exit."""
+        """Clean up the lock file and signal listener on exit."""
+        try:
+            if self.listener is not None:
+                self.listener.close()
+                self.listener = None
+        except:
+            pass
         try:
-            if os.path.exists(self.lockfile):
+            if self.lockfd is not None:
+                os.close(self.lockfd)
+                self.lockfd = None
                 os.remove(self.lockfile)
         except:
             pass
     
     def check_for_signals(self, show_callback):
-        """Check for signals from other instances periodically."""
-        signal_file = os.path.join(tempfile.gettempdir(), f"{self.unique_id}.signal")
+        """Listen for signals from other instances on the IPC endpoint."""
+        try:
+            # A crashed instance can leave its socket file behind, which would block bind()
+            if sys.platform != 'win32' and os.path.exists(self.ipc_path):
+                os.remove(self.ipc_path)
+            self.listener = Listener(self.ipc_path)
+        except Exception as e:
+            print(f"Error creating signal listener: {e}")
+            return
+        
+        listener = self.listener
         
         def check_signal_thread():
-            last_modified = 0
             while True:
                 try:
-                    if os.path.exists(signal_file):
-                        # Get file modification time
-                        mod_time = os.path.getmtime(signal_file)
-                        if mod_time > last_modified:
-                            # Signal file was recently modified
-                            last_modified = mod_time
-                            
-                            # Check signal content
-                            with open(signal_file, 'r') as f:
-                                signal_data = f.read().strip()
-                            
-                            # Process signal
-                            parts = signal_data.split('|')
-                            if len(parts) >= 1 and parts[0] == "SHOW_WINDOW":
-                                print("Received show window signal")
-                                if show_callback:
-                                    # Call in main thread
-                                    if hasattr(show_callback, '__self__') and hasattr(show_callback.__self__, 'after'):
-                                        show_callback.__self__.after(0, show_callback)
-                                    else:
-                                        show_callback()
+                    # Blocks in the kernel until another instance connects
+                    conn = listener.accept()
+                except OSError as e:
+                    if self.listener is None:
+                        # Listener was closed during shutdown
+                        break
+                    print(f"Error accepting signal connection: {e}")
+                    time.sleep(1)
+                    continue
+                    
+                try:
+                    with conn:
+                        signal_data = conn.recv_bytes(64).decode('utf-8', errors='replace')
+                except (EOFError, OSError) as e:
+                    # Peer disconnected early or sent an oversized message; only this
+                    # connection is affected
+                    print(f"Error reading signal: {e}")
+                    continue
+                    
+                try:
+                    # Process signal
+                    parts = signal_data.split('|')
+                    if len(parts) >= 1 and parts[0] == "SHOW_WINDOW":
+                        print("Received show window signal")
+                        if show_callback:
+                            # Call in main thread
+                            if hasattr(show_callback, '__self__') and hasattr(show_callback.__self__, 'after'):
+                                show_callback.__self__.after(0, show_callback)
+                            else:
+                                show_callback()
                 except Exception as e:
                     print(f"Error checking for signals: {e}")
-                finally:
-                    # Check every second
-                    time.sleep(1)
         
-        # Start signal checking in background thread
+        # Start signal listening in background thread
         signal_thread = threading.Thread(target=check_signal_thread, daemon=True)
         signal_thread.start()
 
@@ -156,32 +173,30 @@ from models.shared_state import SharedState
 from ui.main_window import MainWindow
 
 # Import utils
-from utils.time_utils import get_current_times, get_formatted_time, get_current_username
+from utils.time_utils import get_formatted_time, get_current_username, TIME_FORMAT
 from utils.type_handler import FileTypeHandler
 
-# Define icon paths properly with resource_path for PyInstaller compatibility
-ICON_MAIN = resource_path(os.path.join("resources", "icons", "inveni_icon.ico"))
-ICON_TASKBAR = resource_path(os.path.join("resources", "icons", "inveni_icon.ico"))
-ICON_TRAY = resource_path(os.path.join("resources", "icons", "inveni_icon.ico"))
-ICON_DIALOG = resource_path(os.path.join("resources", "icons", "inveni_icon.ico")) 
+# Define icon path properly with resource_path for PyInstaller compatibility
+# The window, taskbar, tray and dialogs all share one icon, so resolve and check it once
+_ICON_PATH = resource_path(os.path.join("resources", "icons", "inveni_icon.ico"))
+_ICON_EXISTS = os.path.isfile(_ICON_PATH)
+
+# Number of files shown in the tray's Recent Files submenu
+RECENT_FILES_LIMIT = 5
+
+# Delay used to coalesce bursts of tray updates into a single redraw
+TRAY_UPDATE_DELAY_MS = 200
+
+# How often a running backup folder migration is checked for completion
+MIGRATION_POLL_MS = 1000
+
+# Username is constant for the life of the process; resolve it once for log prefixes
+_CACHED_USERNAME = get_current_username()
 
 # Helper for timestamp formatting
 def get_timestamp_str():
-    """Get a formatted timestamp string for logging."""
-    try:
-        # Try to use utc_iso if available in get_current_times()
-        times = get_current_times()
-        if 'utc_iso' in times:
-            return times['utc_iso']
-        elif 'utc' in times:
-            # If only utc is available, format it
-            return times['utc'].strftime("%Y-%m-%d %H:%M:%S")
-        else:
-            # Fallback to simple datetime formatting
-            return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    except Exception:
-        # Last resort fallback
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    """Get a formatted UTC timestamp string for logging."""
+    return datetime.now(timezone.utc).strftime(TIME_FORMAT)
 
 class InveniApp:
     """Main application class with system tray integration."""
@@ -189,18 +204,27 @@ class InveniApp:
     def __init__(self):
         """Initialize the application and core components."""
         # Set DPI awareness for Windows
-        try:
-            from ctypes import windll
-            windll.shcore.SetProcessDpiAwareness(1)
-        except:
-            pass
+        if sys.platform == 'win32':
+            try:
+                ctypes.windll.shcore.SetProcessDpiAwareness(1)
+            except (AttributeError, OSError):
+                # shcore is unavailable before Windows 8.1, or awareness was already set
+                pass
             
         # Track tray state
         self.tray_icon = None
         self.tray_thread = None
         self.tray_active = False  # Track if tray is already created
+        self._tray_generation = 0  # Bumped whenever a new tray icon replaces the old one
         self.pending_changes = 0
         self.files_with_changes = set()
+        self._recent_cache = None  # Newest existing tracked files, rebuilt after commits and (un)tracking
+        self._recent_paths = {}  # Recent Files menu item -> file path
+        self._refresh_pending = False  # Tray menu rebuild already scheduled
+        self._status_pending = False  # Tray icon redraw already scheduled
+        
+        # Flag to indicate app is being destroyed
+        self.is_exiting = False
             
         # Initialize window
         self.root = tk.Tk()
@@ -209,16 +233,12 @@ class InveniApp:
         # Override close button to minimize to tray
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
-        # Set window icon - Try taskbar icon first, then main icon
+        # Set window icon - Try bundled icon first, then assets fallback
         try:
-            if os.path.exists(ICON_TASKBAR):
-                self.root.iconbitmap(ICON_TASKBAR)
-                self.icon_path = ICON_TASKBAR
-                print(f"Using taskbar icon: {ICON_TASKBAR}")
-            elif os.path.exists(ICON_MAIN):
-                self.root.iconbitmap(ICON_MAIN)
-                self.icon_path = ICON_MAIN
-                print(f"Using main icon: {ICON_MAIN}")
+            if _ICON_EXISTS:
+                self.root.iconbitmap(_ICON_PATH)
+                self.icon_path = _ICON_PATH
+                print(f"Using taskbar icon: {_ICON_PATH}")
             elif os.path.exists("assets/icon.ico"):
                 self.root.iconbitmap("assets/icon.ico")
                 self.icon_path = "assets/icon.ico"
@@ -230,11 +250,15 @@ class InveniApp:
             print(f"Could not load icon: {e}")
             self.icon_path = None
         
+        # Decode the tray icon once and pre-render every badge state (0-9+ pending changes)
+        self._base_tray_image = self._load_base_tray_image()
+        self._badge_cache = {n: self._render_tray_image(n) for n in range(10)}
+        
         # Initialize core components
         self.settings_manager = SettingsManager()
         self.shared_state = SharedState()
 
-        self.shared_state.app_icon_path = ICON_DIALOG
+        self.shared_state.app_icon_path = _ICON_PATH
         
         # Add methods to SharedState for system tray updates
         def notify_system_tray_update(status):
@@ -242,10 +266,17 @@ class InveniApp:
             
         def notify_version_commit():
             # Call this after a file is committed to update the recent files menu
+            self._recent_cache = None
+            self.refresh_tray_menu()
+            
+        def notify_tracking_change():
+            # Tracking or untracking a file changes which files are recent
+            self._recent_cache = None
             self.refresh_tray_menu()
         
         self.shared_state.notify_system_tray_update = notify_system_tray_update
         self.shared_state.notify_version_commit = notify_version_commit  # NEW: Connect version commits to tray refresh
+        self.shared_state.notify_tracking_change = notify_tracking_change
         
         # Initialize version and backup managers
         self.version_manager = VersionManager(
@@ -257,6 +288,11 @@ class InveniApp:
             self.version_manager
         )
         
+        # Backups from a fixed-up backup folder may still be moving in; the migration merges
+        # them with any written meanwhile, and lookups made before they arrive are dropped after
+        if self.settings_manager.is_migrating:
+            self._watch_migration()
+        
         # Initialize main window first
         self.app = MainWindow(
             self.root,
@@ -285,24 +321,32 @@ class InveniApp:
         # Initialize utilities
         self.file_type_handler = FileTypeHandler()
         
-        # Flag to indicate app is being destroyed
-        self.is_exiting = False
-        
         # Set up system tray
         self.setup_system_tray()
         
         # Load existing tracked files
         try:
             tracked_files = self.version_manager.load_tracked_files()
+            
+            # Group by directory so each folder is listed once instead of stat-ing every file
+            by_dir = defaultdict(list)
             for file_path in tracked_files:
-                if os.path.exists(file_path):
-                    self.file_monitor.set_file(file_path)
+                by_dir[os.path.dirname(file_path)].append((os.path.basename(file_path), file_path))
+            
+            for directory, entries in by_dir.items():
+                try:
+                    with os.scandir(directory or '.') as it:
+                        present = {entry.name for entry in it}
+                except (FileNotFoundError, NotADirectoryError, PermissionError):
+                    continue
+                for name, file_path in entries:
+                    if name in present:
+                        self.file_monitor.set_file(file_path)
         except Exception as e:
             print(f"Error loading tracked files: {e}")
             
-        # Log startup with dynamic username from time_utils
-        current_username = get_current_username()
-        print(f"[{get_timestamp_str()}] [{current_username}] Inveni started with system tray support")
+        # Log startup
+        print(f"[{get_timestamp_str()}] [{_CACHED_USERNAME}] Inveni started with system tray support")
 
     def on_file_changed(self, file_path, has_changed):
         """Handle file change notifications with tray update."""
@@ -313,6 +357,114 @@ class InveniApp:
         # Call the original notification function
         self.shared_state.notify_file_changed(file_path, has_changed)
             
+    def _load_base_tray_image(self):
+        """Load and decode the tray icon image without any status badge."""
+        # Try to load the specific tray icon first, then fallback in order
+        if _ICON_EXISTS:
+            icon_path = _ICON_PATH
+            print(f"Using tray icon: {_ICON_PATH}")
+        elif self.icon_path:
+            # Already verified to exist when the window icon was set
+            icon_path = self.icon_path
+            print(f"Using fallback icon for tray: {self.icon_path}")
+        else:
+            icon_path = None
+            print("No icons found, using generated icon for tray")
+        
+        if icon_path:
+            try:
+                # For .ico files we need special handling
+                if icon_path.endswith('.ico'):
+                    # Convert to PNG first if it's an ICO file
+                    return Image.open(icon_path).convert('RGBA').copy()
+                return Image.open(icon_path).copy()
+            except Exception as e:
+                print(f"Error loading icon - using default: {e}")
+        
+        return self._create_default_icon()
+    
+    def _render_tray_image(self, pending):
+        """Render the tray icon with a change indicator for the given pending count."""
+        # No indicator needed - share the decoded base image rather than allocating a copy
+        if pending <= 0:
+            return self._base_tray_image
+        
+        image = self._base_tray_image.copy()
+        
+        # Add change indicator
+        try:
+            draw = ImageDraw.Draw(image)
+            
+            # Calculate position (bottom right corner)
+            width, height = image.size
+            circle_size = min(width, height) // 3
+            x = width - circle_size - 2
+            y = height - circle_size - 2
+            
+            # Draw red circle
+            draw.ellipse(
+                (x, y, x + circle_size, y + circle_size),
+                fill='red'
+            )
+            
+            # Add number if more than one change
+            if pending > 1:
+                x_text = x + circle_size // 2 - 4
+                y_text = y + circle_size // 2 - 4
+                draw.text(
+                    (x_text, y_text),
+                    str(min(pending, 9)),
+                    fill='white'
+                )
+        except Exception as e:
+            print(f"Error drawing notification indicator: {e}")
+        
+        return image
+    
+    def _get_tray_image(self, pending):
+        """Get the pre-rendered tray icon for the given pending count."""
+        return self._badge_cache[max(0, min(pending, 9))]
+    
+    def _build_menu(self):
+        """Build the tray menu items from the current state."""
+        # Get recent files for menu
+        recent_files = self.get_recent_files()
+        
+        # Create menu items based on current state - SIMPLIFIED as requested
+        menu_items = [
+            pystray.MenuItem('Open Inveni', self.show_window),
+        ]
+        
+        # Add recent files submenu if available
+        recent_paths = {}
+        if recent_files:
+            recent_menu_items = []
+            for file_path in recent_files[:RECENT_FILES_LIMIT]:
+                try:
+                    # All entries share one bound callback; the clicked item maps back to its path
+                    menu_item = pystray.MenuItem(os.path.basename(file_path), self._on_recent_clicked)
+                    recent_paths[menu_item] = file_path
+                    recent_menu_items.append(menu_item)
+                except Exception as e:
+                    print(f"Error adding recent file to menu: {e}")
+            
+            if recent_menu_items:
+                menu_items.append(
+                    pystray.MenuItem('Recent Files', pystray.Menu(*recent_menu_items))
+                )
+        
+        # Add exit item (all other options removed as requested)
+        menu_items.append(pystray.MenuItem('Exit', self.exit_app))
+        
+        self._recent_paths = recent_paths
+        return menu_items
+    
+    def _on_recent_clicked(self, icon, item):
+        """Handle a click on an entry in the Recent Files submenu."""
+        file_path = self._recent_paths.get(item)
+        if file_path:
+            self.select_file_from_tray(file_path)
+    
     def setup_system_tray(self):
         """Set up system tray icon and menu."""
         try:
@@ -323,130 +475,41 @@ class InveniApp:
             # Set flag to prevent multiple concurrent setups
             self.tray_active = True
             
-            # If previous tray exists, stop it 
+            # Any icon from an earlier generation is now stale and winds down on its own thread
+            self._tray_generation += 1
+            generation = self._tray_generation
+            
+            # If previous tray exists, stop it without waiting for its thread
             if self.tray_icon is not None:
                 try:
-                    # Don't try to join the thread if we're on it
-                    current_thread = threading.current_thread()
-                    if self.tray_thread and current_thread is not self.tray_thread:
-                        self.tray_icon.stop()
-                        if self.tray_thread.is_alive():
-                            self.tray_thread.join(timeout=1.0)
-                    else:
-                        # Just stop it without joining
-                        self.tray_icon.stop()
+                    self.tray_icon.stop()
                 except Exception as e:
                     print(f"Error stopping previous tray icon: {e}")
             
-            # Function to create tray icon with status indicators
-            def create_icon():
-                # Try to load the specific tray icon first, then fallback in order
-                if os.path.exists(ICON_TRAY):
-                    icon_path = ICON_TRAY
-                    print(f"Using tray icon: {ICON_TRAY}")
-                elif self.icon_path and os.path.exists(self.icon_path):
-                    icon_path = self.icon_path
-                    print(f"Using fallback icon for tray: {self.icon_path}")
-                else:
-                    icon_path = None
-                    print("No icons found, using generated icon for tray")
-                
-                if icon_path:
-                    try:
-                        # For .ico files we need special handling
-                        if icon_path.endswith('.ico'):
-                            # Convert to PNG first if it's an ICO file
-                            image = Image.open(icon_path)
-                            image = image.convert('RGBA')
-                        else:
-                            image = Image.open(icon_path)
-                    except Exception as e:
-                        print(f"Error loading icon - using default: {e}")
-                        image = self._create_default_icon()
-                else:
-                    image = self._create_default_icon()
-                
-                # Add change indicator if needed
-                if self.pending_changes > 0:
-                    try:
-                        draw = ImageDraw.Draw(image)
-                        
-                        # Calculate position (bottom right corner)
-                        width, height = image.size
-                        circle_size = min(width, height) // 3
-                        x = width - circle_size - 2
-                        y = height - circle_size - 2
-                        
-                        # Draw red circle
-                        draw.ellipse(
-                            (x, y, x + circle_size, y + circle_size),
-                            fill='red'
-                        )
-                        
-                        # Add number if more than one change
-                        if self.pending_changes > 1:
-                            x_text = x + circle_size // 2 - 4
-                            y_text = y + circle_size // 2 - 4
-                            draw.text(
-                                (x_text, y_text),
-                                str(min(self.pending_changes, 9)),
-                                fill='white'
-                            )
-                    except Exception as e:
-                        print(f"Error drawing notification indicator: {e}")
-                
-                return image
-                
-            # Get recent files for menu
-            recent_files = self.get_recent_files()
-            
-            # Create menu items based on current state - SIMPLIFIED as requested
-            menu_items = [
-                pystray.MenuItem('Open Inveni', self.show_window),
-            ]
-            
-            # Add recent files submenu if available
-            if recent_files:
-                recent_menu_items = []
-                for file_path in recent_files[:5]:  # Limit to 5 recent files
-                    try:
-                        file_name = os.path.basename(file_path)
-                        # Create a proper callback function for each file
-                        def create_callback(path):
-                            return lambda _: self.select_file_from_tray(path)
-                        
-                        recent_menu_items.append(
-                            pystray.MenuItem(file_name, create_callback(file_path))
-                        )
-                    except Exception as e:
-                        print(f"Error adding recent file to menu: {e}")
-                
-                if recent_menu_items:
-                    menu_items.append(
-                        pystray.MenuItem('Recent Files', pystray.Menu(*recent_menu_items))
-                    )
-            
-            # Add exit item (all other options removed as requested)
-            menu_items.append(pystray.MenuItem('Exit', self.exit_app))
-            
             # Create the tray icon
             self.tray_icon = pystray.Icon(
                 "Inveni",
-                create_icon(),
+                self._get_tray_image(self.pending_changes),
                 "Inveni File Versioning",
-                menu=pystray.Menu(*menu_items)
+                menu=pystray.Menu(*self._build_menu())
             )
             
+            def setup_icon(icon):
+                # Superseded before its loop started - exit instead of showing a duplicate
+                if generation != self._tray_generation:
+                    icon.stop()
+                    return
+                icon.visible = True
+            
             # Run the tray icon in a separate thread
             self.tray_thread = threading.Thread(
                 target=self.tray_icon.run,
+                kwargs={'setup': setup_icon},
                 daemon=True
             )
             self.tray_thread.start()
             
-            # Use dynamic username from time_utils
-            current_username = get_current_username()
-            print(f"[{get_timestamp_str()}] [{current_username}] System tray integration activated")
+            print(f"[{get_timestamp_str()}] [{_CACHED_USERNAME}] System tray integration activated")
             
         except Exception as e:
             print(f"Failed to set up system tray: {e}")
@@ -455,25 +518,37 @@ class InveniApp:
             self.tray_active = False
     
     def refresh_tray_menu(self):
-        """Refresh the system tray menu to show updated recent files."""
+        """Schedule a refresh of the system tray menu to show updated recent files."""
+        try:
+            # If we're exiting or a refresh is already queued, don't schedule another
+            if self._refresh_pending or self.is_exiting:
+                return
+                
+            # Delay slightly to ensure version data is saved; bursts collapse into one rebuild
+            self._refresh_pending = True
+            self.root.after(TRAY_UPDATE_DELAY_MS, self._do_refresh_tray_menu)
+        except Exception as e:
+            self._refresh_pending = False
+            print(f"Error scheduling tray menu refresh: {e}")
+    
+    def _do_refresh_tray_menu(self):
+        """Rebuild the system tray menu with the latest recent files."""
+        self._refresh_pending = False
         try:
             # If we're exiting, don't update
             if self.is_exiting:
                 return
+            
+            # Build the tray from scratch only if it doesn't exist yet
+            if self.tray_icon is None:
+                self.setup_system_tray()
+                return
                 
-            # Delay slightly to ensure version data is saved
-            time.sleep(0.2)
+            # Swap the menu on the live icon instead of recreating it
+            if not self.tray_active:
+                self.tray_icon.menu = pystray.Menu(*self._build_menu())
                 
-            # Only update if tray exists and we're not already updating
-            if hasattr(self, 'tray_icon') and self.tray_icon is not None and not self.tray_active:
-                # Check if icon is alive before updating
-                if self.tray_thread and self.tray_thread.is_alive():
-                    # Reset and recreate the tray icon with fresh menu
-                    self.setup_system_tray()
-                    
-                    # Use dynamic username from time_utils
-                    current_username = get_current_username()
-                    print(f"[{get_timestamp_str()}] [{current_username}] Refreshed tray menu with latest files")
+                print(f"[{get_timestamp_str()}] [{_CACHED_USERNAME}] Refreshed tray menu with latest files")
         except Exception as e:
             print(f"Error refreshing tray menu: {e}")
     
@@ -484,9 +559,7 @@ class InveniApp:
             if self.is_exiting:
                 return
             
-            # Use dynamic username from time_utils
-            current_username = get_current_username()
-            print(f"[{get_timestamp_str()}] [{current_username}] Selecting file from tray: {file_path}")
+            print(f"[{get_timestamp_str()}] [{_CACHED_USERNAME}] Selecting file from tray: {file_path}")
             
             # First make the window visible
             self.show_window()
@@ -507,27 +580,46 @@ class InveniApp:
     def get_recent_files(self):
         """Get list of recently accessed files."""
         try:
+            if self._recent_cache is not None:
+                recent = [path for path in self._recent_cache if os.path.exists(path)]
+                if len(recent) == len(self._recent_cache):
+                    return recent
+                # A listed file was deleted or moved; rebuild so an older one takes its place
+                self._recent_cache = None
+                
+            # Rebuild the top entries only after a commit or a missing file invalidated them
             tracked_files = self.version_manager.load_tracked_files()
             
-            # Sort files by last accessed time if available
-            recent_files = []
-            for file_path, data in tracked_files.items():
-                if os.path.exists(file_path):
-                    try:
-                        last_time = data.get('last_accessed', 0)
-                        if not last_time and 'versions' in data:
-                            # Use latest version timestamp if available
-                            versions = data.get('versions', {})
-                            if versions:
-                                last_time = max(v.get('timestamp', 0) for v in versions.values())
-                        
-                        recent_files.append((file_path, last_time))
-                    except Exception:
-                        recent_files.append((file_path, 0))
-            
-            # Sort by time (newest first) and return just the paths
-            recent_files.sort(key=lambda x: x[1], reverse=True)
-            return [path for path, _ in recent_files]
+            def last_time(item):
+                data = item[1]
+                try:
+                    # Use latest version timestamp if last access time is not available
+                    last = data.get('last_accessed') or data.get('latest', {}).get('timestamp') or max(
+                        (v.get('timestamp', '') for v in data.get('versions', {}).values()),
+                        default=''
+                    )
+                    return str(last)
+                except Exception:
+                    return ''
+            
+            # Take the newest few instead of sorting every tracked file, widening the pick
+            # until enough of them still exist; only picked files are checked
+            exists = {}
+            count = RECENT_FILES_LIMIT
+            while True:
+                newest = heapq.nlargest(count, tracked_files.items(), key=last_time)
+                recent = []
+                for path, _ in newest:
+                    if path not in exists:
+                        exists[path] = os.path.exists(path)
+                    if exists[path]:
+                        recent.append(path)
+                if len(recent) >= RECENT_FILES_LIMIT or count >= len(tracked_files):
+                    break
+                count *= 2
+            self._recent_cache = recent[:RECENT_FILES_LIMIT]
+            
+            return list(self._recent_cache)
         except Exception as e:
             print(f"Error getting recent files: {e}")
             return []
@@ -557,15 +649,42 @@ class InveniApp:
                 self.pending_changes = status.get('pending_changes', self.pending_changes)
                 self.files_with_changes = set(status.get('files_with_changes', []))
             
-            # Only update if tray exists and we're not already updating
-            if hasattr(self, 'tray_icon') and self.tray_icon is not None and not self.tray_active:
-                # Check if icon is alive before updating
-                if self.tray_thread and self.tray_thread.is_alive():
-                    # Reset and recreate the tray icon
-                    self.setup_system_tray()
+            # Redraw once per burst; the latest status is picked up when it runs
+            if not self._status_pending:
+                self._status_pending = True
+                self.root.after(TRAY_UPDATE_DELAY_MS, self._do_update_tray_status)
         except Exception as e:
+            self._status_pending = False
             print(f"Error updating tray status: {e}")
     
+    def _do_update_tray_status(self):
+        """Apply the current pending-change count to the tray icon."""
+        self._status_pending = False
+        try:
+            # If we're exiting, don't update
+            if self.is_exiting:
+                return
+            
+            # Build the tray from scratch only if it doesn't exist yet
+            if self.tray_icon is None:
+                self.setup_system_tray()
+                return
+                
+            # Swap the image on the live icon instead of recreating it
+            if not self.tray_active:
+                self.tray_icon.icon = self._get_tray_image(self.pending_changes)
+        except Exception as e:
+            print(f"Error updating tray status: {e}")
+    
+    def _watch_migration(self):
+        """Check the background backup folder migration until it ends, then refresh backup lookups."""
+        if self.is_exiting:
+            return
+        if self.settings_manager.is_migrating:
+            self.root.after(MIGRATION_POLL_MS, self._watch_migration)
+        else:
+            self.backup_manager.forget_folder_listings()
+    
     def on_close(self):
         """Handle window close event - minimize to tray."""
         # Don't process if we're already exiting
@@ -607,9 +726,7 @@ class InveniApp:
                 
             self.is_exiting = True
             
-            # Use dynamic username from time_utils
-            current_username = get_current_username()
-            print(f"[{get_timestamp_str()}] [{current_username}] Inveni exiting")
+            print(f"[{get_timestamp_str()}] [{_CACHED_USERNAME}] Inveni exiting")
             
             # Disable all event handlers that might trigger UI updates
             try:
@@ -623,12 +740,11 @@ class InveniApp:
                     except:
                         pass
                 
-                # 3. Disable timer-based updates
-                for after_id in self.root.tk.call('after', 'info'):
-                    try:
-                        self.root.after_cancel(after_id)
-                    except:
-                        pass
+                # 3. Disable timer-based updates (one Tcl evaluation instead of a round-trip per id)
+                try:
+                    self.root.tk.eval('foreach id [after info] { after cancel $id }')
+                except:
+                    pass
                         
                 # 4. Set a flag in shared state to stop updates
                 if hasattr(self.shared_state, 'is_exiting'):
@@ -728,9 +844,8 @@ def main():
     try:
         # Display current time and username information
         current_time = get_formatted_time(use_utc=True)
-        current_username = get_current_username()
         print(f"Current Date and Time (UTC - YYYY-MM-DD HH:MM:SS formatted): {current_time}")
-        print(f"Current User's Login: {current_username}")
+        print(f"Current User's Login: {_CACHED_USERNAME}")
         
         # Check if another instance is already running
         instance_checker = SingleInstanceChecker()
@@ -752,10 +867,8 @@ def main():
         print(error_msg)
         
         with open("error.log", "a", encoding='utf-8') as f:
-            # Use dynamic username from time_utils
-            current_username = get_current_username()
             timestamp = get_timestamp_str()
-            f.write(f"[{timestamp}] [{current_username}] {error_msg}\n")
+            f.write(f"[{timestamp}] [{_CACHED_USERNAME}] {error_msg}\n")
             
         messagebox.showerror("Error", error_msg)
         raise
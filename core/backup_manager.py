@@ -1,14 +1,145 @@
 import os
-import gzip
+import zlib
+import errno
+import struct
 import shutil
 import hashlib
-import platform
+import subprocess
+import time
+import heapq
+import queue
+import atexit
+import logging
 import appdirs
-from typing import Dict, Any, Optional, List, Set
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Any, Optional, List, Set, Tuple, Iterator
 from tkinter import messagebox
 
+# Optional multi-threaded gzip backend (python-isal)
+try:
+    from isal import igzip_threaded
+except ImportError:
+    igzip_threaded = None
+
+# Optional SIMD-accelerated, zlib-compatible deflate/inflate (python-isal); stdlib zlib otherwise
+try:
+    from isal import isal_zlib
+except ImportError:
+    isal_zlib = None
+
+# Optional Zstandard backend; when installed, new backups are written as .zst
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
 # Import the centralized time utilities
-from utils.time_utils import get_formatted_time, get_current_username
+from utils.time_utils import get_formatted_time, get_current_username, TIME_FORMAT
+
+# Chunk size for streaming files through zlib
+READ_BUFFER_SIZE = 128 * 1024
+
+# Write buffer for compressed backup files
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# zlib window bits that select the gzip container (header + CRC32/ISIZE trailer)
+GZIP_WBITS = 31
+
+# Deflate level used when settings don't specify 'compression_level'
+DEFAULT_COMPRESSION_LEVEL = 6
+
+# Zstandard level used when settings don't specify 'zstd_level'
+DEFAULT_ZSTD_LEVEL = 3
+
+# Backup file extensions; new backups use the first, lookups try both so either format stays readable
+GZIP_EXT = '.gz'
+ZSTD_EXT = '.zst'
+BACKUP_EXTENSIONS = (ZSTD_EXT, GZIP_EXT) if zstd is not None else (GZIP_EXT, ZSTD_EXT)
+
+# Files at least this large are compressed in parallel when a backend is available
+PARALLEL_MIN_SIZE = 4 * 1024 * 1024
+
+# pigz binary used for parallel compression when python-isal isn't installed
+PIGZ_PATH = shutil.which('pigz')
+
+# Office document extensions restored through a temp file and atomic replace
+OFFICE_EXTS = ('.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx')
+
+# Maximum number of entries kept in the missing-backups cache
+MAX_MISSING_CACHE = 4096
+
+# Upper bound on output produced per decompress call, keeps memory per step bounded
+DECOMPRESS_MAX_LENGTH = 256 * 1024
+
+# Output preallocated from a backup's recorded size is capped at this many times the
+# backup's own size, so a corrupted header can't force a huge allocation
+SIZE_HINT_MAX_RATIO = 64
+
+# Error log rotation: size of one log file and number of rotated files kept
+ERROR_LOG_MAX_BYTES = 1024 * 1024
+ERROR_LOG_BACKUP_COUNT = 3
+
+# Error loggers by log file path, so each file gets a single handler and writer thread
+_error_loggers: Dict[str, logging.Logger] = {}
+
+class _UsernameFilter(logging.Filter):
+    """Stamp records with the current username on the writer thread."""
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.username = get_current_username()
+        return True
+
+def _get_error_logger(log_file_path: str) -> logging.Logger:
+    """
+    Get a logger that appends to log_file_path from a background thread.
+    
+    Args:
+        log_file_path: Path of the error log file
+        
+    Returns:
+        Logger whose records are queued and written by a QueueListener
+    """
+    logger = _error_loggers.get(log_file_path)
+    if logger is not None:
+        return logger
+        
+    # The file stays open across records and is only opened on the first one
+    file_handler = RotatingFileHandler(log_file_path, maxBytes=ERROR_LOG_MAX_BYTES,
+                                       backupCount=ERROR_LOG_BACKUP_COUNT,
+                                       encoding='utf-8', delay=True)
+    formatter = logging.Formatter("[%(asctime)s] [%(username)s] %(message)s", datefmt=TIME_FORMAT)
+    formatter.converter = time.gmtime
+    file_handler.setFormatter(formatter)
+    file_handler.addFilter(_UsernameFilter())
+    
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler)
+    listener.start()
+    # Drain pending records before the interpreter exits
+    atexit.register(listener.stop)
+    
+    logger = logging.getLogger(f"inveni.backup.{len(_error_loggers)}")
+    logger.setLevel(logging.ERROR)
+    logger.propagate = False
+    logger.addHandler(QueueHandler(log_queue))
+    _error_loggers[log_file_path] = logger
+    return logger
+
+def _isal_level(level: int) -> int:
+    """Map a zlib 0-9 compression level onto ISA-L's 0-3 scale."""
+    return min(3, max(0, level) // 3)
+
+def _new_compressor(level: int):
+    """Create a gzip-format compressor, using ISA-L when it is installed."""
+    if isal_zlib is not None:
+        return isal_zlib.compressobj(_isal_level(level), isal_zlib.DEFLATED, GZIP_WBITS)
+    return zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+
+def _new_decompressor():
+    """Create a gzip-format decompressor, using ISA-L when it is installed."""
+    if isal_zlib is not None:
+        return isal_zlib.decompressobj(GZIP_WBITS)
+    return zlib.decompressobj(GZIP_WBITS)
 
 class BackupManager:
     """Manages file backups and restoration."""
@@ -35,29 +166,65 @@ class BackupManager:
         self.version_manager = version_manager
         self.debug = debug
         
-        # Cache to avoid repeated lookups for non-existent backups
-        self._known_missing_backups = set()
+        # Bounded LRU cache of (path, hash) keys to avoid repeated lookups for non-existent backups
+        self._known_missing_backups = OrderedDict()
+        
+        # Directory -> short hash used in version folder names; version folders already migrated
+        self._dir_hash_cache: Dict[str, str] = {}
+        self._dirs_migrated: Set[str] = set()
+        
+        # Folders already created by _ensure_dir, so makedirs runs once per folder
+        self._ensured_dirs: Set[str] = set()
+        
+        # Version folder -> min-heap of (mtime, path, hash) for its backups, filled on first use
+        self._backup_index: Dict[str, List[Tuple[float, str, str]]] = {}
+        
+        # Created on the first error so no log folder appears until one is needed
+        self._error_logger: Optional[logging.Logger] = None
         
         # Create backup directory if it doesn't exist
         os.makedirs(self.backup_folder, exist_ok=True)
         print(f"Using backup folder: {self.backup_folder}")
         
-    def create_backup(self, file_path: str, file_hash: str, settings: dict) -> str:
-        """Create a compressed backup and manage backup count."""
+        # Move backups from the old versions/{filename} layout once, so lookups only check one path
+        self._migrate_legacy_layout()
+        
+    def create_backup(self, file_path: str, file_hash: str, settings: dict,
+                      tracked_files: Optional[Dict] = None) -> str:
+        """
+        Create a compressed backup and manage backup count.
+        
+        Version entries of pruned backups are removed from the tracked files on disk and,
+        if given, from tracked_files, so a caller saving its copy afterwards keeps the prune.
+        """
         try:
             normalized_path = os.path.normpath(file_path)
-            backup_path = self._get_backup_path(normalized_path, file_hash)
+            backup_path = self._ensure_backup_path(normalized_path, file_hash, BACKUP_EXTENSIONS[0])
             
             # Clear known missing backups for this file as we're making changes
             self._clear_missing_cache_for_file(normalized_path)
             
             print(f"Creating backup at: {backup_path}")
             
-            # Create compressed backup
-            with open(normalized_path, 'rb') as src, gzip.open(backup_path, 'wb') as dst:
-                shutil.copyfileobj(src, dst)
+            try:
+                self._write_backup(normalized_path, backup_path, settings)
+            except FileNotFoundError:
+                version_dir = os.path.dirname(backup_path)
+                if os.path.isdir(version_dir):
+                    # The source file is what's missing
+                    raise
+                # The version folder was removed after _ensure_dir created it; create it again
+                self._ensured_dirs.discard(version_dir)
+                self._ensure_dir(version_dir)
+                self._write_backup(normalized_path, backup_path, settings)
+                    
+            # Drop a copy of this version left behind in the other format
+            try:
+                os.remove(self._compute_backup_path(normalized_path, file_hash, BACKUP_EXTENSIONS[1]))
+            except FileNotFoundError:
+                pass
+            self._record_backup(normalized_path, file_hash, backup_path)
 
-            tracked_files = self.version_manager.load_tracked_files() if self.version_manager else {}
             max_backups = settings.get('max_backups', 5)
             
             # Call improved clean_old_backups that properly enforces limits
@@ -69,32 +236,151 @@ class BackupManager:
             self._log_error(f"Failed to create backup: {str(e)}")
             raise
             
+    def _write_backup(self, normalized_path: str, backup_path: str, settings: dict) -> None:
+        """Create the compressed backup, spreading large files across cores when possible."""
+        if zstd is not None:
+            self._compress_to_zstd(normalized_path, backup_path, settings.get('zstd_level', DEFAULT_ZSTD_LEVEL))
+        else:
+            level = settings.get('compression_level', DEFAULT_COMPRESSION_LEVEL)
+            if not (os.path.getsize(normalized_path) >= PARALLEL_MIN_SIZE
+                    and self._compress_parallel(normalized_path, backup_path, level)):
+                self._compress_to_gzip(normalized_path, backup_path, level)
+                
+    def _compress_to_gzip(self, src_path: str, dst_path: str, level: int) -> None:
+        """Stream a file through zlib (or ISA-L) into a gzip-format backup."""
+        compressor = _new_compressor(level)
+        with open(src_path, 'rb', buffering=0) as src, open(dst_path, 'wb', buffering=WRITE_BUFFER_SIZE) as dst:
+            while True:
+                chunk = src.read(READ_BUFFER_SIZE)
+                if not chunk:
+                    break
+                dst.write(compressor.compress(chunk))
+            dst.write(compressor.flush())
+            
+    def _compress_to_zstd(self, src_path: str, dst_path: str, level: int) -> None:
+        """Stream a file into a Zstandard backup, using worker threads for large files."""
+        size = os.path.getsize(src_path)
+        threads = -1 if size >= PARALLEL_MIN_SIZE else 0
+        compressor = zstd.ZstdCompressor(level=level, threads=threads, write_content_size=True)
+        with open(src_path, 'rb', buffering=0) as src, open(dst_path, 'wb', buffering=WRITE_BUFFER_SIZE) as dst:
+            compressor.copy_stream(src, dst, size=size, read_size=READ_BUFFER_SIZE, write_size=WRITE_BUFFER_SIZE)
+            
+    def _compress_parallel(self, src_path: str, dst_path: str, level: int) -> bool:
+        """
+        Compress a file with a multi-threaded gzip backend.
+        
+        Returns:
+            bool: True if the backup was written, False if no parallel backend could be used.
+        """
+        threads = os.cpu_count() or 1
+        if threads < 2:
+            return False
+            
+        try:
+            if igzip_threaded is not None:
+                with open(src_path, 'rb', buffering=0) as src, \
+                        igzip_threaded.open(dst_path, 'wb', compresslevel=_isal_level(level), threads=threads) as dst:
+                    shutil.copyfileobj(src, dst, READ_BUFFER_SIZE)
+                return True
+                
+            if PIGZ_PATH:
+                with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+                    subprocess.run(
+                        [PIGZ_PATH, f"-{level}", "-p", str(threads), "-c"],
+                        stdin=src,
+                        stdout=dst,
+                        check=True,
+                        creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+                    )
+                return True
+        except (OSError, subprocess.SubprocessError) as e:
+            self._log_error(f"Parallel compression failed, falling back to zlib: {str(e)}")
+            
+        return False
+            
+    def _iter_decompress(self, src, backup_path: str) -> Iterator[bytes]:
+        """Yield bounded decompressed chunks from an open backup."""
+        if backup_path.endswith(ZSTD_EXT):
+            if zstd is None:
+                raise RuntimeError(f"The zstandard package is required to read {backup_path}")
+            # read_to_iter stops quietly at a cut-off frame, so check against the recorded size
+            expected = self._content_size_hint(src, backup_path)
+            produced = 0
+            for data in zstd.ZstdDecompressor().read_to_iter(src, read_size=READ_BUFFER_SIZE, write_size=DECOMPRESS_MAX_LENGTH):
+                produced += len(data)
+                yield data
+            if produced < expected:
+                raise EOFError(f"Backup is truncated: {backup_path}")
+            return
+            
+        decompressor = _new_decompressor()
+        
+        while True:
+            chunk = src.read(READ_BUFFER_SIZE)
+            if not chunk:
+                break
+            while chunk:
+                data = decompressor.decompress(chunk, DECOMPRESS_MAX_LENGTH)
+                if data:
+                    yield data
+                if decompressor.eof:
+                    # Concatenated gzip members are valid; continue with a fresh decompressor
+                    chunk = decompressor.unused_data
+                    if chunk:
+                        decompressor = _new_decompressor()
+                else:
+                    chunk = decompressor.unconsumed_tail
+        
+        data = decompressor.flush()
+        if data:
+            yield data
+        if not decompressor.eof:
+            raise EOFError(f"Backup is truncated: {backup_path}")
+            
+    def _content_size_hint(self, src, backup_path: str) -> int:
+        """Read the uncompressed size recorded in an open backup, or 0 if unknown."""
+        if backup_path.endswith(ZSTD_EXT):
+            # Zstandard frame header carries the content size (written by _compress_to_zstd)
+            size = zstd.frame_content_size(src.read(18)) if zstd is not None else 0
+        else:
+            # The gzip trailer holds the uncompressed size (mod 2**32)
+            src.seek(-4, os.SEEK_END)
+            size = struct.unpack('<I', src.read(4))[0]
+        src.seek(0)
+        return max(size, 0)
+        
+    def _stream_decompress(self, backup_path: str, out_fp) -> None:
+        """Stream-decompress a backup into a writable binary file object."""
+        # Unbuffered source: zlib consumes whole chunks, an extra buffer layer only adds copies
+        with open(backup_path, 'rb', buffering=0) as src:
+            for data in self._iter_decompress(src, backup_path):
+                out_fp.write(data)
+            
     def restore_file_version(self, file_path: str, file_hash: str) -> None:
         """Restore a specific version of a file."""
         try:
             normalized_path = os.path.normpath(file_path)
-            backup_path = self._get_backup_path(normalized_path, file_hash)
+            backup_path = self._locate_backup(normalized_path, file_hash)
             
+            if backup_path is None:
+                raise FileNotFoundError(f"Backup not found for version {file_hash} of {normalized_path}")
+
             if self.debug:
                 print(f"Restoring from backup: {backup_path}")
 
-            if not self.check_backup_exists(normalized_path, file_hash):
-                raise FileNotFoundError(f"Backup not found: {backup_path}")
-
             # Create backup of current file in temp backup folder
             temp_backup_path = self._get_temp_backup_path(normalized_path)
             if os.path.exists(normalized_path):
-                shutil.copy2(normalized_path, temp_backup_path)
+                self._fast_copy(normalized_path, temp_backup_path)
 
             # Check if this is an Office document (doc, docx, xls, xlsx, ppt, pptx)
-            _, ext = os.path.splitext(normalized_path)
-            if ext.lower() in ['.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx']:
+            if normalized_path.lower().endswith(OFFICE_EXTS):
                 # Use special handling for Office documents
                 self._restore_office_document(normalized_path, backup_path)
             else:
                 # Regular restore for other file types
-                with gzip.open(backup_path, 'rb') as src, open(normalized_path, 'wb') as dst:
-                    shutil.copyfileobj(src, dst)
+                with open(normalized_path, 'wb') as dst:
+                    self._stream_decompress(backup_path, dst)
 
         except PermissionError as e:
             self._log_error(f"Permission denied restoring file: {str(e)}")
@@ -109,6 +395,25 @@ class BackupManager:
             self._log_error(f"Restore failed: {str(e)}")
             raise
     
+    def _fast_copy(self, src_path: str, dst_path: str) -> None:
+        """Copy a file and its metadata like shutil.copy2, in-kernel where the OS supports it."""
+        if hasattr(os, 'copy_file_range'):
+            try:
+                with open(src_path, 'rb') as fsrc, open(dst_path, 'wb') as fdst:
+                    remaining = os.fstat(fsrc.fileno()).st_size
+                    while remaining > 0:
+                        copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                        if not copied:
+                            break
+                        remaining -= copied
+                shutil.copystat(src_path, dst_path)
+                return
+            except OSError:
+                # Unsupported filesystem or kernel (e.g. EXDEV, ENOSYS); fall back to a regular copy
+                pass
+                
+        shutil.copy2(src_path, dst_path)
+        
     def _restore_office_document(self, target_file: str, backup_path: str) -> None:
         """Special method to handle restoring Office documents which may be locked or protected."""
         # Create a temporary file in the same directory as the target
@@ -116,8 +421,17 @@ class BackupManager:
         temp_file = os.path.join(temp_dir, f"temp_{os.path.basename(target_file)}")
         
         try:
-            # First check if the file is accessible for writing
-            if os.path.exists(target_file) and not self._can_write_to_file(target_file):
+            # Extract the compressed backup to a temporary file
+            with open(temp_file, 'wb') as dst:
+                self._stream_decompress(backup_path, dst)
+                
+            # Atomically replace the target with our temporary file (no window where it's missing);
+            # a locked document is detected by the rename itself failing
+            try:
+                os.replace(temp_file, target_file)
+            except OSError as e:
+                if not isinstance(e, PermissionError) and e.errno not in (errno.EACCES, errno.EBUSY):
+                    raise
                 # Use centralized time and username utilities
                 current_time = get_formatted_time(use_utc=True)
                 username = get_current_username()
@@ -125,29 +439,7 @@ class BackupManager:
                 raise PermissionError(
                 f"The file appears to be open in Microsoft Office.\n"
                 f"Please close the document in Word/Excel/PowerPoint first, then try again."
-                )
-                
-            # Extract the compressed backup to a temporary file
-            with gzip.open(backup_path, 'rb') as src, open(temp_file, 'wb') as dst:
-                shutil.copyfileobj(src, dst)
-                
-            # Replace the target file with our temporary file
-            if os.path.exists(target_file):
-                # For Windows, use a special method to handle potentially locked files
-                if platform.system() == 'Windows':
-                    try:
-                        # First try to remove the target 
-                        os.unlink(target_file)
-                    except:
-                        # If that fails, try using os.replace which can sometimes work with locked files
-                        pass
-                    os.rename(temp_file, target_file)
-                else:
-                    # For other platforms
-                    os.replace(temp_file, target_file)
-            else:
-                # If target doesn't exist, simply rename the temp file
-                os.rename(temp_file, target_file)
+                ) from e
                 
         except Exception as e:
             # Clean up the temporary file if it exists
@@ -158,188 +450,303 @@ class BackupManager:
                     pass
             raise
     
-    def _can_write_to_file(self, file_path: str) -> bool:
-        """Check if we can write to a file."""
-        if not os.path.exists(file_path):
-            # File doesn't exist, check if directory is writable
-            return os.access(os.path.dirname(file_path), os.W_OK)
-            
-        # Try to open the file for writing to check if it's locked
-        try:
-            with open(file_path, 'a'):
-                pass
-            return True
-        except:
-            return False
-    
     def get_version_content(self, file_path: str, file_hash: str) -> bytes:
         """Get the content of a specific version."""
         try:
             normalized_path = os.path.normpath(file_path)
-            backup_path = self._get_backup_path(normalized_path, file_hash)
             
             # Check if backup exists using our optimized method
-            if not self.check_backup_exists(normalized_path, file_hash):
-                raise FileNotFoundError(f"Backup not found: {backup_path}")
+            backup_path = self._locate_backup(normalized_path, file_hash)
+            if backup_path is None:
+                raise FileNotFoundError(f"Backup not found for version {file_hash} of {normalized_path}")
                 
-            # Read compressed content
-            with gzip.open(backup_path, 'rb') as f:
-                return f.read()
+            with open(backup_path, 'rb', buffering=0) as src:
+                # Allocate the output once from the size recorded in the backup, within reason
+                size = min(self._content_size_hint(src, backup_path),
+                           os.fstat(src.fileno()).st_size * SIZE_HINT_MAX_RATIO)
+                
+                content = bytearray(size)
+                pos = 0
+                for data in self._iter_decompress(src, backup_path):
+                    end = pos + len(data)
+                    if end <= size:
+                        content[pos:end] = data
+                    else:
+                        # Size hint was short (unknown, capped, multi-member or over 4 GiB); grow from here on
+                        del content[pos:]
+                        content += data
+                        size = end
+                    pos = end
+                    
+                del content[pos:]
+                return bytes(content)
                 
         except Exception as e:
             self._log_error(f"Failed to read version content: {str(e)}")
             raise
     
-    def _get_cache_key(self, file_path: str, file_hash: str) -> str:
+    # Private helpers below take paths already normalized by the public entry points
+    
+    def _get_cache_key(self, normalized_path: str, file_hash: str) -> Tuple[str, str]:
         """Generate a cache key for the missing backups cache."""
-        normalized_path = os.path.normpath(file_path)
-        return f"{normalized_path}|{file_hash}"
+        # Tuples hash from the strings' cached hashes, no per-probe string building
+        return (normalized_path, file_hash)
     
-    def _clear_missing_cache_for_file(self, file_path: str) -> None:
+    def _clear_missing_cache_for_file(self, normalized_path: str) -> None:
         """Clear all missing cache entries for a specific file."""
-        normalized_path = os.path.normpath(file_path)
-        prefix = f"{normalized_path}|"
-        
-        # Use a list to avoid modifying the set during iteration
-        to_remove = [key for key in self._known_missing_backups if key.startswith(prefix)]
+        # Use a list to avoid modifying the cache during iteration
+        to_remove = [key for key in self._known_missing_backups if key[0] == normalized_path]
         for key in to_remove:
-            self._known_missing_backups.discard(key)
+            self._known_missing_backups.pop(key, None)
+    
+    def _remember_missing(self, cache_key: Tuple[str, str]) -> None:
+        """Record a missing backup, evicting the least recently used entry when full."""
+        self._known_missing_backups[cache_key] = None
+        self._known_missing_backups.move_to_end(cache_key)
+        if len(self._known_missing_backups) > MAX_MISSING_CACHE:
+            self._known_missing_backups.popitem(last=False)
     
     def check_backup_exists(self, file_path: str, file_hash: str) -> bool:
         """Check if a backup exists for the given file and hash."""
+        return self._backup_exists(os.path.normpath(file_path), file_hash)
+        
+    def _backup_exists(self, normalized_path: str, file_hash: str) -> bool:
+        """Check if a backup exists for an already normalized file path."""
+        return self._locate_backup(normalized_path, file_hash) is not None
+        
+    def _locate_backup(self, normalized_path: str, file_hash: str) -> Optional[str]:
+        """Find the backup file of a version in either format, or None if there is none."""
         # Check the cache first to avoid repeated filesystem checks
-        cache_key = self._get_cache_key(file_path, file_hash)
+        cache_key = self._get_cache_key(normalized_path, file_hash)
         if cache_key in self._known_missing_backups:
-            return False
+            self._known_missing_backups.move_to_end(cache_key)
+            return None
             
-        normalized_path = os.path.normpath(file_path)
-        backup_path = self._get_backup_path(normalized_path, file_hash)
-        exists = os.path.exists(backup_path)
+        # The format new backups are written in comes first, so the usual hit is a single check
+        for ext in BACKUP_EXTENSIONS:
+            backup_path = self._compute_backup_path(normalized_path, file_hash, ext)
+            if os.path.exists(backup_path):
+                return backup_path
+                
+        # Add to cache of known missing backups to avoid future filesystem checks
+        self._remember_missing(cache_key)
         
-        if not exists:
-            # Try the old backup path approach if not found (compatibility)
-            base_name = os.path.basename(normalized_path)
-            old_version_dir = os.path.join(self.backup_folder, "versions", base_name)
-            old_backup_path = os.path.join(old_version_dir, f"{file_hash}.gz")
-            exists = os.path.exists(old_backup_path)
+        # Only log if debug mode is enabled
+        if self.debug:
+            print(f"Backup not found for version {file_hash} of {normalized_path}")
             
-            if exists and self.debug:
-                print(f"Found backup using old path structure: {old_backup_path}")
-                # Optional: migrate to new path structure
-                # shutil.copy2(old_backup_path, backup_path)
-        
-        if not exists:
-            # Add to cache of known missing backups to avoid future filesystem checks
-            self._known_missing_backups.add(cache_key)
+        return None
             
-            # Only log if debug mode is enabled
-            if self.debug:
-                print(f"Backup not found at: {backup_path}")
-            
-        return exists
-            
-    def _get_backup_path(self, file_path: str, file_hash: str) -> str:
+    def _get_version_dir(self, normalized_path: str) -> str:
         """
-        Construct the backup file path consistently across app runs.
+        Get the folder holding all backups of a file, consistently across app runs.
         
         Uses a deterministic folder path based on filename and a stable hash of the directory.
+        Never creates the folder; see _ensure_backup_path for writers.
         """
-        normalized_path = os.path.normpath(file_path)
         base_name = os.path.basename(normalized_path)
         file_dir = os.path.dirname(normalized_path)
         
-        # Use a deterministic hash based on the directory path
-        # MD5 is used here because we just need a consistent folder name, not security
-        dir_hash = hashlib.md5(file_dir.encode('utf-8')).hexdigest()[:8]
+        version_dir = os.path.join(self.backup_folder, "versions", f"{self._get_dir_hash(file_dir)}_{base_name}")
+        if version_dir not in self._dirs_migrated:
+            self._migrate_md5_version_dir(file_dir, base_name, version_dir)
+            self._dirs_migrated.add(version_dir)
+        return version_dir
         
-        version_dir = os.path.join(self.backup_folder, "versions", f"{dir_hash}_{base_name}")
-        os.makedirs(version_dir, exist_ok=True)
-        return os.path.join(version_dir, f"{file_hash}.gz")
+    def _compute_backup_path(self, normalized_path: str, file_hash: str, ext: str = BACKUP_EXTENSIONS[0]) -> str:
+        """Construct the backup file path without touching the filesystem (for readers)."""
+        return os.path.join(self._get_version_dir(normalized_path), f"{file_hash}{ext}")
         
-    def _get_temp_backup_path(self, file_path: str) -> str:
+    def _ensure_backup_path(self, normalized_path: str, file_hash: str, ext: str) -> str:
+        """Construct the backup file path and create its folder if needed (for writers)."""
+        version_dir = self._get_version_dir(normalized_path)
+        self._ensure_dir(version_dir)
+        return os.path.join(version_dir, f"{file_hash}{ext}")
+        
+    def _ensure_dir(self, dir_path: str) -> None:
+        """Create a folder on first use only; later calls are a set lookup."""
+        if dir_path not in self._ensured_dirs:
+            os.makedirs(dir_path, exist_ok=True)
+            self._ensured_dirs.add(dir_path)
+        
+    def _get_dir_hash(self, file_dir: str) -> str:
+        """Get the short, deterministic hash of a directory path used in version folder names."""
+        dir_hash = self._dir_hash_cache.get(file_dir)
+        if dir_hash is None:
+            # We just need a consistent 8-character folder tag, not security;
+            # a 4-byte BLAKE2b digest is cheaper than MD5 for that
+            dir_hash = hashlib.blake2b(file_dir.encode('utf-8'), digest_size=4).hexdigest()
+            self._dir_hash_cache[file_dir] = dir_hash
+        return dir_hash
+        
+    def _migrate_md5_version_dir(self, file_dir: str, base_name: str, version_dir: str) -> None:
+        """Rename a version folder created with the older MD5-based directory hash."""
+        if os.path.exists(version_dir):
+            return
+            
+        md5_hash = hashlib.md5(file_dir.encode('utf-8')).hexdigest()[:8]
+        old_version_dir = os.path.join(self.backup_folder, "versions", f"{md5_hash}_{base_name}")
+        if os.path.isdir(old_version_dir):
+            try:
+                os.rename(old_version_dir, version_dir)
+                if self.debug:
+                    print(f"Migrated version folder: {old_version_dir} -> {version_dir}")
+            except OSError as e:
+                self._log_error(f"Failed to migrate version folder {old_version_dir}: {str(e)}")
+        
+    def _migrate_legacy_layout(self) -> None:
+        """
+        Move backups stored under the old versions/{filename} folders into per-directory folders.
+        
+        The old layout didn't record the source directory, so each backup is matched to the
+        tracked file whose versions include its hash. Runs once, guarded by versions/.migrated.
+        """
+        versions_dir = os.path.join(self.backup_folder, "versions")
+        sentinel = os.path.join(versions_dir, ".migrated")
+        if os.path.exists(sentinel) or not self.version_manager:
+            return
+            
+        try:
+            tracked_files = self.version_manager.load_tracked_files()
+            legacy_dirs = set()
+            for path, info in tracked_files.items():
+                normalized_path = os.path.normpath(path)
+                old_version_dir = os.path.join(versions_dir, os.path.basename(normalized_path))
+                if not os.path.isdir(old_version_dir):
+                    continue
+                legacy_dirs.add(old_version_dir)
+                    
+                for file_hash in info.get("versions", {}):
+                    old_backup_path = os.path.join(old_version_dir, f"{file_hash}.gz")
+                    if not os.path.exists(old_backup_path):
+                        continue
+                    backup_path = self._ensure_backup_path(normalized_path, file_hash, GZIP_EXT)
+                    if not os.path.exists(backup_path):
+                        os.replace(old_backup_path, backup_path)
+                        if self.debug:
+                            print(f"Migrated backup: {old_backup_path} -> {backup_path}")
+                            
+            # Drop old folders that are now empty; anything left belongs to untracked files
+            for old_version_dir in legacy_dirs:
+                try:
+                    os.rmdir(old_version_dir)
+                except OSError:
+                    pass
+                    
+            self._ensure_dir(versions_dir)
+            with open(sentinel, 'w', encoding='utf-8'):
+                pass
+        except Exception as e:
+            self._log_error(f"Failed to migrate legacy backup layout: {str(e)}")
+            
+    def _get_temp_backup_path(self, normalized_path: str) -> str:
         """Get path for temporary .bak file in backup folder."""
-        normalized_path = os.path.normpath(file_path)
         base_name = os.path.basename(normalized_path)
         
         # Use consistent time format from utilities with UTC time
         timestamp = get_formatted_time(use_utc=True).replace(":", "").replace(" ", "_").replace("-", "")[:15]
         
         backup_dir = os.path.join(self.backup_folder, "temp_backups")
-        os.makedirs(backup_dir, exist_ok=True)
+        self._ensure_dir(backup_dir)
         return os.path.join(backup_dir, f"{base_name}.{timestamp}.bak")
     
-    def _get_all_backup_files(self, file_path: str) -> List[Dict]:
+    def _get_all_backup_files(self, normalized_path: str) -> List[Dict]:
         """Get all backup files for a given file path, sorted by creation time."""
-        normalized_path = os.path.normpath(file_path)
-        version_dir = os.path.dirname(self._get_backup_path(normalized_path, "dummy"))
+        version_dir = self._get_version_dir(normalized_path)
         
-        if not os.path.exists(version_dir):
+        # Single directory scan; DirEntry carries the path and caches its stat result
+        try:
+            with os.scandir(version_dir) as entries:
+                backup_files = [
+                    {
+                        'path': entry.path,
+                        'hash': entry.name.rsplit('.', 1)[0],
+                        'mtime': entry.stat().st_mtime
+                    }
+                    for entry in entries if entry.name.endswith(BACKUP_EXTENSIONS)
+                ]
+        except FileNotFoundError:
             return []
-            
-        backup_files = []
-        for filename in os.listdir(version_dir):
-            if filename.endswith('.gz'):
-                file_path = os.path.join(version_dir, filename)
-                backup_files.append({
-                    'path': file_path,
-                    'hash': os.path.splitext(filename)[0],
-                    'mtime': os.path.getmtime(file_path)
-                })
                 
         # Sort by modification time (newest first)
         backup_files.sort(key=lambda x: x['mtime'], reverse=True)
         return backup_files
         
-    def _clean_old_backups(self, file_path: str, max_backups: int, tracked_files: Dict) -> None:
+    def _get_backup_index(self, normalized_path: str) -> List[Tuple[float, str, str]]:
+        """Get the oldest-first heap of a file's backups, scanning its folder only the first time."""
+        version_dir = self._get_version_dir(normalized_path)
+        heap = self._backup_index.get(version_dir)
+        if heap is None:
+            heap = [(b['mtime'], b['path'], b['hash']) for b in self._get_all_backup_files(normalized_path)]
+            heapq.heapify(heap)
+            self._backup_index[version_dir] = heap
+        return heap
+        
+    def _record_backup(self, normalized_path: str, file_hash: str, backup_path: str) -> None:
+        """Add a newly written backup to the index, replacing any older entry for the same version."""
+        heap = self._get_backup_index(normalized_path)
+        # Heaps hold at most a few max_backups entries, so a linear rebuild here is cheap
+        if any(entry[2] == file_hash for entry in heap):
+            heap[:] = [entry for entry in heap if entry[2] != file_hash]
+            heapq.heapify(heap)
+        heapq.heappush(heap, (time.time(), backup_path, file_hash))
+        
+    def _clean_old_backups(self, normalized_path: str, max_backups: int, tracked_files: Optional[Dict] = None) -> None:
         """
         Clean up old backups keeping only the most recent ones.
         This method properly enforces the max_backups limit and updates caches.
+        Matching version entries are removed from the tracked files on disk, in one write
+        before any backup is deleted, and from tracked_files if given.
         """
         try:
-            normalized_path = os.path.normpath(file_path)
             if self.debug:
                 print(f"Cleaning old backups for {normalized_path}, max allowed: {max_backups}")
             
-            # Get all backup files from the filesystem
-            all_backups = self._get_all_backup_files(normalized_path)
+            # In-memory index of this file's backups, oldest on top; no folder listing after the first
+            backup_heap = self._get_backup_index(normalized_path)
+            backup_count = len(backup_heap)
             
-            if not all_backups:
+            if not backup_count:
                 if self.debug:
                     print("No backup files found to clean")
                 return
                 
             # If we have more backups than allowed, delete the oldest ones
-            if len(all_backups) > max_backups:
-                # Keep the newest max_backups, delete the rest
-                backups_to_delete = all_backups[max_backups:]
-                backups_to_keep = all_backups[:max_backups]
+            if backup_count > max_backups:
+                print(f"Found {backup_count} backups, keeping {max_backups}, deleting {backup_count - max_backups}")
                 
-                print(f"Found {len(all_backups)} backups, keeping {len(backups_to_keep)}, deleting {len(backups_to_delete)}")
-                
-                # Delete excess backup files
-                for backup in backups_to_delete:
+                # Drop the version entries first, so no listed version is left without its backup
+                excess = heapq.nsmallest(backup_count - max_backups, backup_heap)
+                if self.version_manager:
+                    self.version_manager.remove_versions(normalized_path, [entry[2] for entry in excess])
+                    
+                # Delete excess backup files, oldest first
+                while len(backup_heap) > max_backups:
+                    _, backup_path, backup_hash = heapq.heappop(backup_heap)
                     try:
-                        os.remove(backup['path'])
-                        print(f"Deleted old backup: {backup['path']}")
+                        try:
+                            os.remove(backup_path)
+                        except FileNotFoundError:
+                            # Already removed outside the app
+                            pass
+                        if self.debug:
+                            print(f"Deleted old backup: {backup_path}")
                         
                         # Add to missing backups cache
-                        cache_key = self._get_cache_key(normalized_path, backup['hash'])
-                        self._known_missing_backups.add(cache_key)
+                        cache_key = self._get_cache_key(normalized_path, backup_hash)
+                        self._remember_missing(cache_key)
                         
                         # Also remove from tracked files if present
-                        if normalized_path in tracked_files and "versions" in tracked_files[normalized_path]:
-                            if backup['hash'] in tracked_files[normalized_path]["versions"]:
-                                del tracked_files[normalized_path]["versions"][backup['hash']]
-                                print(f"Removed version entry for hash: {backup['hash']}")
+                        if tracked_files and normalized_path in tracked_files and "versions" in tracked_files[normalized_path]:
+                            if backup_hash in tracked_files[normalized_path]["versions"]:
+                                del tracked_files[normalized_path]["versions"][backup_hash]
+                                if self.debug:
+                                    print(f"Removed version entry for hash: {backup_hash}")
                     except Exception as e:
-                        self._log_error(f"Failed to delete backup {backup['path']}: {str(e)}")
-                
-                # Save the updated tracked files if we modified them
-                if self.version_manager and normalized_path in tracked_files:
-                    self.version_manager.save_tracked_files(tracked_files)
+                        self._log_error(f"Failed to delete backup {backup_path}: {str(e)}")
             else:
                 if self.debug:
-                    print(f"Only {len(all_backups)} backups found, no cleaning needed (max is {max_backups})")
+                    print(f"Only {backup_count} backups found, no cleaning needed (max is {max_backups})")
 
             # Always clean up old temporary .bak files
             self._cleanup_old_bak_files()
@@ -372,21 +779,18 @@ class BackupManager:
             
     def _log_error(self, error_message: str) -> None:
         """Log error messages with timestamp."""
-        log_dir = os.path.join(self.backup_folder, "logs")
-        os.makedirs(log_dir, exist_ok=True)
-        log_file_path = os.path.join(log_dir, "error_log.txt")
-        
-        # Use centralized time and username utilities
-        current_time = get_formatted_time(use_utc=True)
-        username = get_current_username()
-        
-        with open(log_file_path, "a", encoding='utf-8') as log_file:
-            log_file.write(f"[{current_time}] [{username}] {error_message}\n")
+        if self._error_logger is None:
+            log_dir = os.path.join(self.backup_folder, "logs")
+            self._ensure_dir(log_dir)
+            self._error_logger = _get_error_logger(os.path.join(log_dir, "error_log.txt"))
+            
+        # Timestamp and username are added when the record is written
+        self._error_logger.error(error_message)
             
     def debug_check_paths(self, file_path, file_hash):
         """Debug method to check path construction."""
         normalized_path = os.path.normpath(file_path)
-        backup_path = self._get_backup_path(normalized_path, file_hash)
+        backup_path = self._compute_backup_path(normalized_path, file_hash)
         
         # Check if file exists
         exists = os.path.exists(backup_path)
@@ -417,7 +821,7 @@ class BackupManager:
         
         # Also check direct file format (added for debugging)
         file_dir = os.path.dirname(normalized_path)
-        dir_hash = hashlib.md5(file_dir.encode('utf-8')).hexdigest()[:8]
+        dir_hash = self._get_dir_hash(file_dir)
         direct_backup = os.path.join(self.backup_folder, "versions", f"{dir_hash}_{base_name}")
         direct_exists = os.path.exists(direct_backup)
         
@@ -426,6 +830,11 @@ class BackupManager:
         
         return exists or old_exists or direct_exists
 
+    def forget_folder_listings(self) -> None:
+        """Drop what is cached about the backup folder's contents, after backups arrived from elsewhere."""
+        self._known_missing_backups.clear()
+        self._backup_index.clear()
+
     def clear_missing_cache(self):
         """
         Clear the missing backups cache.
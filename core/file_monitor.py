@@ -1,19 +1,84 @@
 import os
+import sys
 import time
+import logging
 import threading
 import queue
-from typing import Callable, Optional, Dict, Set
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Callable, Optional, Dict, Set, FrozenSet, Iterable, List, Mapping, Tuple
 from threading import Lock
 
+# Optional OS-level change notifications (inotify / FSEvents / ReadDirectoryChangesW)
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
 # Updated imports to match new project structure
 from utils.file_utils import calculate_file_hash
-from utils.time_utils import get_formatted_time, get_current_username
+from utils.time_utils import get_current_username, TIME_FORMAT
+
+# Seconds between full scans of all watched files when no filesystem events are available
+POLL_INTERVAL = 0.5
+
+# Bounds for the adaptive scan interval (settings: poll_interval_min / poll_interval_max)
+POLL_INTERVAL_MIN = 0.2
+POLL_INTERVAL_MAX = 5.0
+
+# Factor the scan interval grows by after each scan that finds no activity
+POLL_BACKOFF = 1.5
+
+# Seconds between safety-net full scans when filesystem events drive change detection
+EVENT_SWEEP_INTERVAL = 30.0
+
+# Worker threads hashing modified files when several change in the same scan
+HASH_WORKERS = 4
+
+# Consecutive unchanged checks after which a file being written is considered closed
+STABLE_TICKS_TO_CLOSE = 2
+
+# Maximum number of files whose last commit dialog time is remembered (least recent dropped first)
+DIALOG_TIME_LIMIT = 1024
+
+# Maximum number of raw -> normalized path entries kept by FileMonitor._norm
+NORM_CACHE_LIMIT = 4096
+
+# Modulus for the aggregate digest: sums of 256-bit SHA-256 values wrap around
+AGGREGATE_DIGEST_MODULUS = 1 << 256
+
+# Event types that can mean a watched file's content changed (ignores our own opens/reads)
+CHANGE_EVENT_TYPES = ('modified', 'created', 'moved', 'closed', 'deleted')
+
+class _DirectoryEventHandler(FileSystemEventHandler):
+    """Forwards filesystem events in a watched directory to the file monitor."""
+    
+    def __init__(self, monitor: 'FileMonitor'):
+        super().__init__()
+        self.monitor = monitor
+        
+    def on_any_event(self, event) -> None:
+        if event.is_directory or event.event_type not in CHANGE_EVENT_TYPES:
+            return
+        # Editors that save via rename report the watched file as the move destination
+        self.monitor._queue_fs_event(event.src_path)
+        dest_path = getattr(event, 'dest_path', None)
+        if dest_path:
+            self.monitor._queue_fs_event(dest_path)
 
 class FileMonitor:
     """Monitors files for changes and triggers appropriate actions."""
     
     def __init__(self, callback: Callable[[str, bool], None], settings=None, shared_state=None, version_manager=None):
-        self.watched_files: Dict[str, Dict] = {}
+        # Copy-on-write state: readers use the current object without locking; writers hold
+        # self.lock, build a replacement and swap it in. Published file_info dicts are never mutated.
+        self.watched_files: Mapping[str, Dict] = MappingProxyType({})
+        
+        # Sum of all watched files' hashes mod 2**256, kept current by _set_watched
+        self._agg_digest = 0
         self.callback = callback
         self.settings = settings
         self.shared_state = shared_state
@@ -21,14 +86,23 @@ class FileMonitor:
         self.tracked_files = self.version_manager.load_tracked_files() if version_manager else {}
         self.lock = Lock()
         self.active_files: Set[str] = set()
-        self.last_dialog_time: Dict[str, float] = {}
+        self.last_dialog_time: OrderedDict = OrderedDict()
         self.dialog_cooldown = 2.0  # Seconds to wait before showing dialog again
         
         # Track files being restored to prevent commit dialog
-        self.restoring_files: Set[str] = set()
+        self.restoring_files: FrozenSet[str] = frozenset()
+        
+        # Status tracking for system tray
+        self.pending_changes_count = 0
+        self.files_with_changes: FrozenSet[str] = frozenset()
+        
+        # Time of the last check per file; only written by the monitor thread
+        self._last_check: Dict[str, float] = {}
         
         # Debug information
         self.username = get_current_username()  # Using centralized username function
+        self.log = logging.getLogger('FileMonitor')
+        self._configure_logging()
         self.debug_mode = True
         
         # Store reference to main application
@@ -36,17 +110,39 @@ class FileMonitor:
         if shared_state and hasattr(shared_state, 'main_app'):
             self.main_app = shared_state.main_app
 
+        # Watched files grouped by parent directory, for one listing per directory per scan
+        self._by_dir: Dict[str, Set[str]] = {}
+        
+        # Event path -> watched_files key, so event delivery is one dict lookup
+        self._path_to_key: Dict[str, str] = {}
+        
+        # Raw path -> normalized path, so repeated calls with the same path skip normpath
+        self._norm_cache: Dict[str, str] = {}
+
         # Background processing
         self.background_queue = queue.Queue()
         self.background_thread = None
         self.running = True
         self.is_monitoring = True  # Added for pause/resume functionality
         self._stop_event = threading.Event()
-        self._start_background_thread()
         
-        # Status tracking for system tray
-        self.pending_changes_count = 0
-        self.files_with_changes = set()
+        # Filesystem event watches, one per directory shared by all watched files in it
+        self._observer = None
+        self._dir_watches: Dict[str, object] = {}  # directory -> watch
+        self._event_handler = _DirectoryEventHandler(self)
+        self._recheck_files: Set[str] = set()  # files with events to check on the next tick
+        self._next_sweep = 0.0
+        self._start_observer()
+        
+        # Hashes modified files in parallel (hashlib releases the GIL on large reads)
+        self._hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='filehash')
+        
+        # Scan interval: drops to the minimum while files are active, backs off while idle
+        self.min_interval = self._interval_setting('poll_interval_min', POLL_INTERVAL_MIN)
+        self.max_interval = max(self.min_interval, self._interval_setting('poll_interval_max', POLL_INTERVAL_MAX))
+        self.current_interval = min(max(POLL_INTERVAL, self.min_interval), self.max_interval)
+        
+        self._start_background_thread()
 
     def _start_background_thread(self):
         """Start the background monitoring thread."""
@@ -57,34 +153,241 @@ class FileMonitor:
             )
             self.background_thread.start()
 
+    def _start_observer(self) -> None:
+        """Start filesystem event notifications if watchdog is available; otherwise keep polling."""
+        if Observer is None:
+            return
+        try:
+            self._observer = Observer()
+            self._observer.daemon = True
+            self._observer.start()
+        except Exception as e:
+            self._log_debug("Filesystem events unavailable, polling instead: %s", e)
+            self._observer = None
+            
+    def _add_watched_path(self, normalized_path: str) -> None:
+        """Index a newly watched file by directory, watching the directory for events on first use."""
+        directory = os.path.dirname(normalized_path)
+        members = self._by_dir.get(directory)
+        if members is None:
+            members = self._by_dir[directory] = set()
+            self._watch_dir(directory)
+        members.add(normalized_path)
+        self._path_to_key[normalized_path] = normalized_path
+        
+    def _remove_watched_path(self, normalized_path: str) -> None:
+        """Drop a file from the directory index, unwatching the directory with its last file."""
+        self._path_to_key.pop(normalized_path, None)
+        directory = os.path.dirname(normalized_path)
+        members = self._by_dir.get(directory)
+        if members is None:
+            return
+        members.discard(normalized_path)
+        if not members:
+            del self._by_dir[directory]
+            self._unwatch_dir(directory)
+            
+    def _watch_dir(self, directory: str) -> None:
+        """Schedule the event watch on a directory."""
+        if self._observer is None:
+            return
+        try:
+            self._dir_watches[directory] = self._observer.schedule(self._event_handler, directory, recursive=False)
+        except Exception as e:
+            # e.g. out of inotify watches: fall back to polling everything
+            self._log_debug("Cannot watch %s, falling back to polling: %s", directory, e)
+            self._stop_observer()
+            
+    def _unwatch_dir(self, directory: str) -> None:
+        """Unschedule the event watch on a directory."""
+        watch = self._dir_watches.pop(directory, None)
+        if watch is None or self._observer is None:
+            return
+        try:
+            self._observer.unschedule(watch)
+        except Exception as e:
+            self._log_debug("Error unwatching %s: %s", directory, e)
+                
+    def _stop_observer(self) -> None:
+        """Stop filesystem event notifications."""
+        observer, self._observer = self._observer, None
+        self._dir_watches.clear()
+        if observer is not None:
+            try:
+                observer.stop()
+                observer.join(timeout=2.0)
+            except Exception:
+                pass
+                
+    def _queue_fs_event(self, path: str) -> None:
+        """Called on the observer thread; hands watched paths to the background thread."""
+        # Events report paths under the directory we scheduled, i.e. already in normalized form
+        key = self._path_to_key.get(os.fsdecode(path))
+        if key is not None:
+            self.add_background_task(self._on_fs_event, key)
+            
+    def _on_fs_event(self, path: str) -> None:
+        """Mark a watched file for checking on the next monitor tick."""
+        with self.lock:
+            if path in self.watched_files:
+                self._recheck_files.add(path)
+                
+    def _interval_setting(self, key: str, default: float) -> float:
+        """Read a positive number of seconds from settings, falling back to the default."""
+        value = self.settings.get(key, default) if self.settings else default
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return default
+        return value if value > 0 else default
+        
     def _background_monitor(self):
         """Background thread for file monitoring."""
+        next_scan = time.monotonic()
         while self.running and not self._stop_event.is_set():
             try:
-                # Process any queued tasks
-                try:
-                    task, args = self.background_queue.get(timeout=0.5)
-                    task(*args)
-                    self.background_queue.task_done()
-                except queue.Empty:
-                    pass
-
+                # Waiting on the queue is the only sleep, so queued tasks run as soon as they arrive
+                batch = self._drain_background_queue(max(0.0, next_scan - time.monotonic()))
+                self._run_background_tasks(batch)
+                if batch and self._recheck_files:
+                    # Something just happened to a watched file; don't sit out a long idle interval
+                    self.current_interval = self.min_interval
+                    next_scan = min(next_scan, time.monotonic() + self.min_interval)
+                if time.monotonic() < next_scan:
+                    continue
+                
                 # Regular file monitoring - only if monitoring is enabled
+                active = False
                 if self.running and not self._stop_event.is_set() and self.is_monitoring:
-                    self.check_for_changes()
-                
-                time.sleep(0.5)  # Reduced sleep time for better responsiveness
+                    if self._observer is None or time.monotonic() >= self._next_sweep:
+                        # Polling, or the periodic safety-net scan when events are on
+                        active = self.check_for_changes()
+                        self._next_sweep = time.monotonic() + EVENT_SWEEP_INTERVAL
+                    elif self._recheck_files:
+                        active = self.check_for_changes(self._recheck_files)
+                        
+                if active:
+                    self.current_interval = self.min_interval
+                else:
+                    self.current_interval = min(self.max_interval, self.current_interval * POLL_BACKOFF)
+                next_scan = time.monotonic() + self.current_interval
             except Exception as e:
-                self._log_debug(f"Error in background monitor: {str(e)}")
-                time.sleep(5)
+                self._log_debug("Error in background monitor: %s", e)
+                # Back off, but let stop() cut the wait short
+                if self._stop_event.wait(timeout=5):
+                    break
+                next_scan = time.monotonic()
 
-    def _log_debug(self, message: str) -> None:
-        """Log debug information with timestamp."""
-        if self.debug_mode:
-            # Using centralized time utility for consistent formatting
-            current_time = get_formatted_time(use_utc=True)
-            print(f"[{current_time}] [{self.username}] {message}")
+    def _drain_background_queue(self, timeout: float) -> List[Tuple[Callable, tuple]]:
+        """
+        Wait up to timeout for a queued task, then take everything else already queued.
+        
+        Args:
+            timeout: Seconds to wait for the first task
+            
+        Returns:
+            List of (task, args) in queue order; empty if nothing arrived
+        """
+        batch = []
+        try:
+            batch.append(self.background_queue.get(timeout=timeout))
+            while True:
+                batch.append(self.background_queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+        
+    def _run_background_tasks(self, batch: List[Tuple[Callable, tuple]]) -> None:
+        """Run a drained batch, keeping only the last task queued per (task, path)."""
+        latest = {}
+        for task, args in batch:
+            key = (task.__name__, args[0] if args else None)
+            # Re-insert so the surviving task keeps the position of its last occurrence
+            latest.pop(key, None)
+            latest[key] = (task, args)
+        try:
+            for task, args in latest.values():
+                try:
+                    task(*args)
+                except Exception as e:
+                    self._log_debug("Error in background task %s: %s", task.__name__, e)
+        finally:
+            for _ in batch:
+                self.background_queue.task_done()
 
+    def _norm(self, path: str) -> str:
+        """Normalize a path, reusing the result for paths seen before."""
+        normalized_path = self._norm_cache.get(path)
+        if normalized_path is None:
+            normalized_path = os.path.normpath(path)
+            if len(self._norm_cache) < NORM_CACHE_LIMIT:
+                self._norm_cache[path] = normalized_path
+        return normalized_path
+        
+    @property
+    def debug_mode(self) -> bool:
+        """Whether debug messages are emitted."""
+        return self.log.isEnabledFor(logging.DEBUG)
+        
+    @debug_mode.setter
+    def debug_mode(self, enabled: bool) -> None:
+        self.log.setLevel(logging.DEBUG if enabled else logging.INFO)
+        
+    def _configure_logging(self) -> None:
+        """Send FileMonitor messages to stdout as '[UTC time] [user] message', once per process."""
+        if self.log.handlers:
+            return
+        handler = logging.StreamHandler(sys.stdout)
+        formatter = logging.Formatter(f"[%(asctime)s] [{self.username}] %(message)s", TIME_FORMAT)
+        formatter.converter = time.gmtime
+        handler.setFormatter(formatter)
+        self.log.addHandler(handler)
+        self.log.propagate = False
+        
+    def _log_debug(self, message: str, *args) -> None:
+        """Log debug information; formatting is deferred until a handler emits it."""
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(message, *args)
+
+    def _set_watched(self, normalized_path: str, file_info: Optional[Dict]) -> None:
+        """Publish watched_files with one entry replaced, or removed if file_info is None. Caller holds self.lock."""
+        watched_files = dict(self.watched_files)
+        if file_info is None:
+            old_info = watched_files.pop(normalized_path, None)
+        else:
+            old_info = watched_files.get(normalized_path)
+            watched_files[normalized_path] = file_info
+            
+        # Swap this file's hash in the aggregate; a sum (unlike XOR) doesn't cancel identical files
+        old_hash = old_info.get('hash') if old_info else None
+        new_hash = file_info.get('hash') if file_info else None
+        if old_hash != new_hash:
+            digest = self._agg_digest
+            if old_hash:
+                digest -= int(old_hash, 16)
+            if new_hash:
+                digest += int(new_hash, 16)
+            self._agg_digest = digest % AGGREGATE_DIGEST_MODULUS
+            
+        self.watched_files = MappingProxyType(watched_files)
+        
+    def _update_watched(self, normalized_path: str, **changes) -> None:
+        """Publish a copy of a watched file's info with some fields changed. Caller holds self.lock."""
+        file_info = self.watched_files.get(normalized_path)
+        if file_info is not None:
+            self._set_watched(normalized_path, {**file_info, **changes})
+            
+    def _set_pending_change(self, normalized_path: str, pending: bool) -> None:
+        """Add or remove a file from files_with_changes and notify the tray. Caller holds self.lock."""
+        if (normalized_path in self.files_with_changes) == pending:
+            return
+        if pending:
+            self.files_with_changes = self.files_with_changes | {normalized_path}
+        else:
+            self.files_with_changes = self.files_with_changes - {normalized_path}
+        self.pending_changes_count = len(self.files_with_changes)
+        self._notify_system_tray_status()
+        
     def add_background_task(self, task, *args):
         """Add a task to be executed in background."""
         self.background_queue.put((task, args))
@@ -92,143 +395,274 @@ class FileMonitor:
     def set_file(self, file_path: Optional[str]) -> None:
         """Set or update a file to be monitored."""
         def _set_file_task(path):
-            with self.lock:
-                if path and os.path.exists(path):
-                    normalized_path = os.path.normpath(path)
-                    try:
-                        current_hash = calculate_file_hash(path)
-                        current_mtime = os.path.getmtime(path)
-                        
-                        self.watched_files[normalized_path] = {
+            stat_result = self._safe_stat(path) if path else None
+            if stat_result is not None:
+                normalized_path = self._norm(path)
+                try:
+                    # Hash before taking the lock so readers and commits aren't held up
+                    current_hash = calculate_file_hash(path)
+                    
+                    with self.lock:
+                        if normalized_path not in self.watched_files:
+                            self._add_watched_path(normalized_path)
+                        self._set_watched(normalized_path, {
                             'hash': current_hash,
-                            'mtime': current_mtime,
-                            'last_check': time.time(),
+                            'fp': (stat_result.st_size, stat_result.st_mtime_ns),
                             'is_open': True,
-                            'size': os.path.getsize(path)
-                        }
+                            'stable_ticks': 0
+                        })
+                        self._last_check[normalized_path] = time.time()
+                        if self._observer is not None:
+                            self._recheck_files.add(normalized_path)
                         
                         self.active_files.add(normalized_path)
-                        self._log_debug(f"Now monitoring: {normalized_path}")
-                        
-                    except Exception as e:
-                        self._log_debug(f"Error setting file {normalized_path}: {str(e)}")
-                else:
+                    self._log_debug("Now monitoring: %s", normalized_path)
+                    
+                except Exception as e:
+                    self._log_debug("Error setting file %s: %s", normalized_path, e)
+            else:
+                with self.lock:
                     self._cleanup_file(path)
 
         self.add_background_task(_set_file_task, file_path)
 
+    def unwatch(self, file_path: str) -> None:
+        """Stop monitoring a file."""
+        with self.lock:
+            self._cleanup_file(file_path)
+
     def _cleanup_file(self, file_path: Optional[str]) -> None:
-        """Clean up monitoring for a file."""
+        """Clean up monitoring for a file. Caller holds self.lock."""
         if file_path:
-            normalized_path = os.path.normpath(file_path)
-            self.watched_files.pop(normalized_path, None)
+            normalized_path = self._norm(file_path)
+            if normalized_path in self.watched_files:
+                self._set_watched(normalized_path, None)
+                self._remove_watched_path(normalized_path)
             self.active_files.discard(normalized_path)
+            self._recheck_files.discard(normalized_path)
+            self._last_check.pop(normalized_path, None)
             
             # Also remove from files with changes for system tray
-            if normalized_path in self.files_with_changes:
-                self.files_with_changes.remove(normalized_path)
-                self.pending_changes_count = max(0, self.pending_changes_count - 1)
-                self._notify_system_tray_status()
+            self._set_pending_change(normalized_path, False)
                 
-            self._log_debug(f"Stopped monitoring: {normalized_path}")
+            self._log_debug("Stopped monitoring: %s", normalized_path)
 
     def mark_file_as_restoring(self, file_path: str) -> None:
         """Mark a file as currently being restored to prevent commit dialog."""
-        normalized_path = os.path.normpath(file_path)
+        normalized_path = self._norm(file_path)
         with self.lock:
-            self.restoring_files.add(normalized_path)
-            self._log_debug(f"Marked file as restoring: {normalized_path}")
+            self.restoring_files = self.restoring_files | {normalized_path}
+            self._log_debug("Marked file as restoring: %s", normalized_path)
 
     def unmark_file_as_restoring(self, file_path: str) -> None:
         """Remove a file from the restoring list once restoration is complete."""
-        normalized_path = os.path.normpath(file_path)
+        normalized_path = self._norm(file_path)
         with self.lock:
             if normalized_path in self.restoring_files:
-                self.restoring_files.remove(normalized_path)
-                self._log_debug(f"Removed file from restoring list: {normalized_path}")
+                self.restoring_files = self.restoring_files - {normalized_path}
+                self._log_debug("Removed file from restoring list: %s", normalized_path)
 
     def is_file_restoring(self, file_path: str) -> bool:
         """Check if a file is currently being restored."""
-        normalized_path = os.path.normpath(file_path)
-        with self.lock:
-            return normalized_path in self.restoring_files
+        return self._norm(file_path) in self.restoring_files
 
-    def check_for_changes(self) -> None:
-        """Check all monitored files for changes."""
+    def check_for_changes(self, paths: Optional[Iterable[str]] = None) -> bool:
+        """
+        Check monitored files for changes.
+        
+        Args:
+            paths: Files to check; all watched files if None
+            
+        Returns:
+            bool: True if any checked file changed or is still being written
+        """
         if not self.is_monitoring:
-            return  # Skip if monitoring is paused
+            return False  # Skip if monitoring is paused
             
+        # Snapshot what to check under the lock; stat and hash without holding it
         with self.lock:
-            current_time = time.time()
+            if paths is None:
+                groups = {directory: set(members) for directory, members in self._by_dir.items()}
+                self._recheck_files.clear()
+            else:
+                groups = {}
+                for file_path in list(paths):
+                    # Checked now; files still being written are added back below
+                    self._recheck_files.discard(file_path)
+                    if file_path in self.watched_files:
+                        groups.setdefault(os.path.dirname(file_path), set()).add(file_path)
+                        
+        current_time = time.time()
+        stat_results = self._stat_watched(groups)
+        hashes = self._submit_hashes(stat_results)
+        active = False
+        for file_path, stat_result in stat_results.items():
+            try:
+                if self._check_file(file_path, stat_result, current_time, hashes.get(file_path)):
+                    active = True
+            except Exception as e:
+                self._log_debug("Error checking %s: %s", file_path, e)
+        return active
+                
+    def _submit_hashes(self, stat_results: Dict[str, Optional[os.stat_result]]) -> Dict[str, Future]:
+        """
+        Start hashing every file whose content may have changed, when there is more than one.
+        
+        Args:
+            stat_results: Path -> stat result from this scan
             
-            for file_path in list(self.watched_files.keys()):
-                if not os.path.exists(file_path):
-                    self._cleanup_file(file_path)
-                    continue
-
+        Returns:
+            Path -> future resolving to the file's hash; empty if at most one file needs hashing
+        """
+        to_hash = []
+        for file_path, stat_result in stat_results.items():
+            file_info = self.watched_files.get(file_path)
+            if stat_result is None or file_info is None:
+                continue
+            recorded_size, recorded_mtime = file_info['fp']
+            # Same test _check_file uses to decide it needs a hash
+            if stat_result.st_size == recorded_size and stat_result.st_mtime_ns != recorded_mtime:
+                to_hash.append(file_path)
+        if len(to_hash) < 2:
+            return {}
+        return {file_path: self._hash_pool.submit(calculate_file_hash, file_path) for file_path in to_hash}
+        
+    @staticmethod
+    def _safe_stat(path: str) -> Optional[os.stat_result]:
+        """Stat a file once, returning None if it doesn't exist."""
+        try:
+            return os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+            
+    def _stat_watched(self, groups: Dict[str, Set[str]]) -> Dict[str, Optional[os.stat_result]]:
+        """
+        Stat watched files, listing each directory that holds several of them only once.
+        
+        Args:
+            groups: Directory -> watched file paths in it
+            
+        Returns:
+            Path -> stat result, or None if the file no longer exists
+        """
+        results: Dict[str, Optional[os.stat_result]] = {}
+        for directory, members in groups.items():
+            if len(members) > 1:
+                by_name = {os.path.basename(path): path for path in members}
                 try:
-                    file_info = self.watched_files[file_path]
-                    current_mtime = os.path.getmtime(file_path)
-                    current_size = os.path.getsize(file_path)
-                    
-                    # Check if file is being written to
-                    if current_size != file_info['size']:
-                        file_info['size'] = current_size
-                        file_info['is_open'] = True
-                        continue
-
-                    # Check for modifications
-                    if current_mtime != file_info['mtime']:
-                        current_hash = calculate_file_hash(file_path)
-                        has_changed = current_hash != file_info['hash']
-                        
-                        # Check if file is closed
-                        was_open = file_info['is_open']
-                        is_closed = self._is_file_closed(file_path)
-                        
-                        if was_open and is_closed and has_changed:
-                            self._handle_file_closed(file_path, current_hash)
-                        
-                        file_info.update({
-                            'hash': current_hash,
-                            'mtime': current_mtime,
-                            'is_open': not is_closed
-                        })
-                        
-                        if has_changed:
-                            # Track changes for system tray
-                            if file_path not in self.files_with_changes:
-                                self.files_with_changes.add(file_path)
-                                self.pending_changes_count += 1
-                                self._notify_system_tray_status()
-                                
-                            self.callback(file_path, True)
-                    
-                    # Update last check time
-                    file_info['last_check'] = current_time
+                    # DirEntry.stat() comes from the directory listing itself on Windows
+                    with os.scandir(directory or '.') as entries:
+                        for entry in entries:
+                            path = by_name.get(entry.name)
+                            if path is not None:
+                                results[path] = entry.stat()
+                except OSError:
+                    pass
                     
-                except Exception as e:
-                    self._log_debug(f"Error checking {file_path}: {str(e)}")
-
-    def _is_file_closed(self, file_path: str) -> bool:
-        """Check if a file is closed using multiple methods."""
-        try:
-            # Try exclusive access
-            with open(file_path, 'rb+') as f:
+            # Single files, plus any the listing didn't match (e.g. case differences)
+            for path in members:
+                if path in results:
+                    continue
+                try:
+                    results[path] = self._safe_stat(path)
+                except OSError as e:
+                    self._log_debug("Cannot stat %s: %s", path, e)
+        return results
+        
+    def _check_file(self, file_path: str, stat_result: Optional[os.stat_result], current_time: float,
+                    hash_future: Optional[Future] = None) -> bool:
+        """
+        Compare one watched file against its recorded state and report changes.
+        
+        Args:
+            file_path: Normalized path of the watched file
+            stat_result: Result of stat for the file, or None if it is gone
+            current_time: Time of this scan
+            hash_future: Hash already being computed for the file, if any
+            
+        Returns:
+            bool: True if the file changed or is still considered open
+        """
+        if stat_result is None:
+            with self.lock:
+                self._cleanup_file(file_path)
+            return True
+            
+        file_info = self.watched_files.get(file_path)
+        if file_info is None:
+            return False
+        
+        # Update last check time
+        self._last_check[file_path] = current_time
+        
+        # Size and nanosecond mtime in one tuple: the unchanged case is a single compare
+        fp = (stat_result.st_size, stat_result.st_mtime_ns)
+        recorded_size, recorded_mtime = file_info['fp']
+        if fp == file_info['fp']:
+            if file_info['is_open']:
+                self._count_stable_tick(file_path, file_info)
                 return True
-        except (IOError, PermissionError):
-            try:
-                # Alternative check: compare consecutive reads
-                size1 = os.path.getsize(file_path)
-                time.sleep(0.1)
-                size2 = os.path.getsize(file_path)
-                return size1 == size2
-            except Exception:
-                return False
+            return False
+        
+        # Check if file is being written to
+        if fp[0] != recorded_size:
+            with self.lock:
+                if self.watched_files.get(file_path) is file_info:
+                    # Keep the old mtime so the next tick sees a modification and hashes
+                    self._update_watched(file_path, fp=(fp[0], recorded_mtime), is_open=True, stable_ticks=0)
+                    # Look again next tick; the write may be over without another event
+                    if self._observer is not None:
+                        self._recheck_files.add(file_path)
+            return True
+
+        # Check for modifications
+        if fp[1] != recorded_mtime:
+            # Hash outside the lock so UI calls aren't blocked behind large files
+            current_hash = hash_future.result() if hash_future else calculate_file_hash(file_path)
+            
+            with self.lock:
+                # Skip if the file was reset or removed while we were hashing
+                if self.watched_files.get(file_path) is not file_info:
+                    return True
+                has_changed = current_hash != file_info['hash']
+                
+                # Treat the file as open until its size and mtime hold still
+                self._update_watched(
+                    file_path,
+                    hash=current_hash,
+                    fp=fp,
+                    is_open=True,
+                    stable_ticks=0,
+                    changed_while_open=file_info.get('changed_while_open', False) or has_changed
+                )
+                if self._observer is not None:
+                    self._recheck_files.add(file_path)
+                
+                if has_changed:
+                    # Track changes for system tray
+                    self._set_pending_change(file_path, True)
+                    self.callback(file_path, True)
+        return True
+
+    def _count_stable_tick(self, file_path: str, file_info: Dict) -> None:
+        """Count a check where an open file didn't change; after enough of them, handle it as closed."""
+        with self.lock:
+            if self.watched_files.get(file_path) is not file_info:
+                return
+            stable_ticks = file_info.get('stable_ticks', 0) + 1
+            if stable_ticks < STABLE_TICKS_TO_CLOSE:
+                self._update_watched(file_path, stable_ticks=stable_ticks)
+                if self._observer is not None:
+                    self._recheck_files.add(file_path)
+                return
+                
+            if file_info.get('changed_while_open'):
+                self._handle_file_closed(file_path, file_info['hash'])
+            self._update_watched(file_path, is_open=False, stable_ticks=0, changed_while_open=False)
 
     def _handle_file_closed(self, file_path: str, current_hash: str) -> None:
         """Handle file closed event with changes."""
-        normalized_path = os.path.normpath(file_path)
+        normalized_path = self._norm(file_path)
         current_time = time.time()
 
         # Refresh tracked files from version manager if available        
@@ -237,39 +671,42 @@ class FileMonitor:
         
         # ALWAYS update the file's hash and metadata, even for restores
         # This ensures future changes will be detected correctly
-        file_info = self.watched_files.get(normalized_path, {})
-        file_info.update({
+        stat_result = self._safe_stat(file_path)
+        self._set_watched(normalized_path, {
+            **self.watched_files.get(normalized_path, {}),
             'hash': current_hash,
-            'mtime': os.path.getmtime(file_path) if os.path.exists(file_path) else 0,
-            'size': os.path.getsize(file_path) if os.path.exists(file_path) else 0,
-            'is_open': False,
-            'last_check': current_time
+            'fp': (stat_result.st_size, stat_result.st_mtime_ns) if stat_result else (0, 0),
+            'is_open': False
         })
-        self.watched_files[normalized_path] = file_info
-        self._log_debug(f"Updated file tracking hash to: {current_hash[:8]}... for {normalized_path}")
+        self._last_check[normalized_path] = current_time
+        self._log_debug("Updated file tracking hash to: %s... for %s", current_hash[:8], normalized_path)
         
         # Check if file is being restored - skip commit dialog if so
         if normalized_path in self.restoring_files:
-            self._log_debug(f"File closed after restore - skipping commit dialog: {normalized_path}")
-            self.unmark_file_as_restoring(normalized_path)
+            self._log_debug("File closed after restore - skipping commit dialog: %s", normalized_path)
+            # Caller holds self.lock, so don't go through unmark_file_as_restoring (it locks again)
+            self.restoring_files = self.restoring_files - {normalized_path}
             return
         
         # Check if file is tracked and dialog cooldown has passed
         if (normalized_path in self.tracked_files and 
             current_time - self.last_dialog_time.get(normalized_path, 0) > self.dialog_cooldown):
             
-            self._log_debug(f"File closed with changes: {normalized_path}")
+            self._log_debug("File closed with changes: %s", normalized_path)
             self._show_commit_dialog(normalized_path)
             self.last_dialog_time[normalized_path] = current_time
+            self.last_dialog_time.move_to_end(normalized_path)
+            if len(self.last_dialog_time) > DIALOG_TIME_LIMIT:
+                self.last_dialog_time.popitem(last=False)
 
     def _show_commit_dialog(self, file_path: str) -> None:
         """Show the quick commit dialog through the main application."""
         if self.main_app:
             try:
                 self.main_app.show_commit_dialog(file_path)
-                self._log_debug(f"Requested commit dialog for: {file_path}")
+                self._log_debug("Requested commit dialog for: %s", file_path)
             except Exception as e:
-                self._log_debug(f"Error showing commit dialog: {str(e)}")
+                self._log_debug("Error showing commit dialog: %s", e)
         else:
             self._log_debug("Cannot show dialog - no main application reference")
             
@@ -281,36 +718,34 @@ class FileMonitor:
             file_path: Path to the file that was committed
             new_hash: Hash of the committed version
         """
-        normalized_path = os.path.normpath(file_path)
+        normalized_path = self._norm(file_path)
         with self.lock:
-            self._log_debug(f"Updating file monitoring state after commit: {normalized_path}")
+            self._log_debug("Updating file monitoring state after commit: %s", normalized_path)
             
             # Update the tracked files list
             self.refresh_tracked_files()
             
             # Update the file's watched state with the new hash
             if normalized_path in self.watched_files:
-                self.watched_files[normalized_path].update({
-                    'hash': new_hash,  # Update to the committed hash
-                    'mtime': os.path.getmtime(normalized_path) if os.path.exists(normalized_path) else 0,
-                    'size': os.path.getsize(normalized_path) if os.path.exists(normalized_path) else 0,
-                    'last_check': time.time(),
-                })
+                stat_result = self._safe_stat(normalized_path)
+                self._update_watched(
+                    normalized_path,
+                    hash=new_hash,  # Update to the committed hash
+                    changed_while_open=False,
+                    fp=(stat_result.st_size, stat_result.st_mtime_ns) if stat_result else (0, 0)
+                )
+                self._last_check[normalized_path] = time.time()
                 
-                self._log_debug(f"Updated monitoring hash to committed version: {new_hash[:8]}... for {normalized_path}")
+                self._log_debug("Updated monitoring hash to committed version: %s... for %s", new_hash[:8], normalized_path)
             else:
                 # If not being watched, add it to watches
                 self.set_file(normalized_path)
                 
             # Reset any "is_restoring" flags just to be safe
-            if normalized_path in self.restoring_files:
-                self.restoring_files.remove(normalized_path)
+            self.restoring_files = self.restoring_files - {normalized_path}
                 
             # Remove from pending changes for system tray
-            if normalized_path in self.files_with_changes:
-                self.files_with_changes.remove(normalized_path)
-                self.pending_changes_count = max(0, self.pending_changes_count - 1)
-                self._notify_system_tray_status()
+            self._set_pending_change(normalized_path, False)
                 
     def force_reset_monitoring(self, file_path: str) -> None:
         """
@@ -320,27 +755,58 @@ class FileMonitor:
         Args:
             file_path: Path to the file to reset
         """
-        normalized_path = os.path.normpath(file_path)
+        normalized_path = self._norm(file_path)
         with self.lock:
             # Remove from watched files to force a clean re-add
             if normalized_path in self.watched_files:
-                self.watched_files.pop(normalized_path)
+                self._set_watched(normalized_path, None)
+                self._remove_watched_path(normalized_path)
                 
             # Remove any restoring flags
-            if normalized_path in self.restoring_files:
-                self.restoring_files.remove(normalized_path)
+            self.restoring_files = self.restoring_files - {normalized_path}
             
             # Remove from pending changes
-            if normalized_path in self.files_with_changes:
-                self.files_with_changes.remove(normalized_path)
-                self.pending_changes_count = max(0, self.pending_changes_count - 1)
-                self._notify_system_tray_status()
+            self._set_pending_change(normalized_path, False)
                 
-            self._log_debug(f"*** FORCED RESET of file monitoring: {normalized_path} ***")
+            self._log_debug("*** FORCED RESET of file monitoring: %s ***", normalized_path)
             
             # Re-add to monitoring with fresh state
             self.set_file(normalized_path)
 
+    def reset_after_restore(self, file_path: str) -> bool:
+        """
+        Re-baseline a file right after a version was restored over it, so the restored
+        content is not reported as a change.
+        
+        Args:
+            file_path: Path to the restored file
+            
+        Returns:
+            bool: True if the file was re-added to monitoring
+        """
+        normalized_path = self._norm(file_path)
+        stat_result = self._safe_stat(normalized_path)
+        if stat_result is None:
+            self.unmark_file_as_restoring(normalized_path)
+            return False
+            
+        # Hash before taking the lock so readers and the monitor thread aren't held up
+        current_hash = calculate_file_hash(normalized_path)
+        file_info = {
+            'hash': current_hash,
+            'fp': (stat_result.st_size, stat_result.st_mtime_ns),
+            'is_open': False  # File is closed after restore
+        }
+        
+        with self.lock:
+            self.restoring_files = self.restoring_files - {normalized_path}
+            if normalized_path not in self.watched_files:
+                self._add_watched_path(normalized_path)
+            self._set_watched(normalized_path, file_info)
+            self._last_check[normalized_path] = time.time()
+            self.active_files.add(normalized_path)
+        return True
+
     def refresh_tracked_files(self) -> None:
         """Refresh the list of tracked files."""
         try:
@@ -350,52 +816,56 @@ class FileMonitor:
                 self._log_debug("No version manager available to refresh tracked files")
             self._log_debug("Tracked files list refreshed")
         except Exception as e:
-            self._log_debug(f"Error refreshing tracked files: {str(e)}")
+            self._log_debug("Error refreshing tracked files: %s", e)
 
     def get_file_status(self, file_path: str) -> Dict:
         """Get detailed status of a monitored file."""
-        normalized_path = os.path.normpath(file_path)
-        with self.lock:
-            if normalized_path in self.watched_files:
-                status = self.watched_files[normalized_path].copy()
-                status['is_tracked'] = normalized_path in self.tracked_files
-                status['is_restoring'] = normalized_path in self.restoring_files
-                status['has_pending_changes'] = normalized_path in self.files_with_changes
-                return status
+        normalized_path = self._norm(file_path)
+        file_info = self.watched_files.get(normalized_path)
+        if file_info is None:
             return {}
+        status = dict(file_info)
+        status['size'], status['mtime_ns'] = file_info['fp']
+        status['last_check'] = self._last_check.get(normalized_path, 0)
+        status['is_tracked'] = normalized_path in self.tracked_files
+        status['is_restoring'] = normalized_path in self.restoring_files
+        status['has_pending_changes'] = normalized_path in self.files_with_changes
+        return status
 
     def get_change_size(self, file_path: str) -> int:
         """Get approximate size of file changes since last hash."""
-        normalized_path = os.path.normpath(file_path)
-        with self.lock:
-            if normalized_path in self.watched_files:
-                current_size = os.path.getsize(normalized_path) if os.path.exists(normalized_path) else 0
-                original_size = self.watched_files[normalized_path].get('size', 0)
-                return abs(current_size - original_size)
-            return 0
+        normalized_path = self._norm(file_path)
+        file_info = self.watched_files.get(normalized_path)
+        if file_info is not None:
+            stat_result = self._safe_stat(normalized_path)
+            current_size = stat_result.st_size if stat_result else 0
+            original_size = file_info['fp'][0]
+            return abs(current_size - original_size)
+        return 0
 
     def get_change_type(self, file_path: str) -> str:
         """Get type of change (addition, deletion, modification)."""
-        normalized_path = os.path.normpath(file_path)
-        with self.lock:
-            if normalized_path in self.watched_files:
-                current_size = os.path.getsize(normalized_path) if os.path.exists(normalized_path) else 0
-                original_size = self.watched_files[normalized_path].get('size', 0)
-                
-                if current_size > original_size:
-                    return "addition"
-                elif current_size < original_size:
-                    return "deletion"
-                else:
-                    return "modification"
-            return "unknown"
+        normalized_path = self._norm(file_path)
+        file_info = self.watched_files.get(normalized_path)
+        if file_info is not None:
+            stat_result = self._safe_stat(normalized_path)
+            current_size = stat_result.st_size if stat_result else 0
+            original_size = file_info['fp'][0]
+            
+            if current_size > original_size:
+                return "addition"
+            elif current_size < original_size:
+                return "deletion"
+            else:
+                return "modification"
+        return "unknown"
 
     def add_new_file(self, file_path: str) -> None:
         """Add a new file to monitoring after first commit"""
         def _add_new_file_task(path):
             with self.lock:
-                normalized_path = os.path.normpath(path)
-                self._log_debug(f"Adding new file to monitor: {normalized_path}")
+                normalized_path = self._norm(path)
+                self._log_debug("Adding new file to monitor: %s", normalized_path)
                 
                 # Refresh tracked files from version manager if available
                 if self.version_manager:
@@ -406,7 +876,7 @@ class FileMonitor:
                 
                 if normalized_path not in self.watched_files:
                     self.set_file(normalized_path)
-                    self._log_debug(f"Started monitoring new file: {normalized_path}")
+                    self._log_debug("Started monitoring new file: %s", normalized_path)
 
         self.add_background_task(_add_new_file_task, file_path)
 
@@ -429,18 +899,28 @@ class FileMonitor:
         
     def get_pending_changes_count(self) -> int:
         """Get number of files with pending changes for system tray."""
-        with self.lock:
-            return self.pending_changes_count
+        return len(self.files_with_changes)
             
     def get_files_with_changes(self) -> Set[str]:
         """Get set of files with pending changes."""
-        with self.lock:
-            return set(self.files_with_changes)
+        return set(self.files_with_changes)
+        
+    def get_aggregate_digest(self) -> int:
+        """
+        Get a digest of the current content of all watched files, updated in O(1) per change.
+        
+        Compare it with a value saved earlier (e.g. after a commit-all) to tell whether
+        any watched file's content differs since then, without walking every file.
+        
+        Returns:
+            int: Sum of the watched files' SHA-256 hashes modulo 2**256
+        """
+        return self._agg_digest
     
     def clear_pending_changes(self):
         """Clear all pending changes (after commit all)."""
         with self.lock:
-            self.files_with_changes.clear()
+            self.files_with_changes = frozenset()
             self.pending_changes_count = 0
             self._notify_system_tray_status()
     
@@ -455,12 +935,16 @@ class FileMonitor:
                 }
                 self.shared_state.notify_system_tray_update(status)
         except Exception as e:
-            self._log_debug(f"Error notifying system tray: {str(e)}")
+            self._log_debug("Error notifying system tray: %s", e)
 
     def stop(self):
         """Stop the background monitoring cleanly."""
         self._stop_event.set()
         self.running = False
+        # Wake the monitor thread if it is blocked waiting on the queue
+        self.background_queue.put((lambda: None, ()))
+        self._stop_observer()
+        self._hash_pool.shutdown(wait=False, cancel_futures=True)
         
         # Wait for queue to finish processing
         try:
@@ -1,21 +1,129 @@
 import os
+import errno
 import platform
 import json
+import hashlib
 import logging
 import shutil
+import queue
+import threading
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Callable
-from logging.handlers import RotatingFileHandler
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from logging.handlers import MemoryHandler, RotatingFileHandler
+
+# Optional fast JSON codec; the stdlib json module is used when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Import the centralized time utilities
 from utils.time_utils import get_formatted_time, get_current_username
 
+# Returned by a validator when a value can't be fixed and the default should be used
+_USE_DEFAULT = object()
+
+def _compile_validator(schema: Dict[str, Any]) -> Callable[[Any], Tuple[bool, Any]]:
+    """
+    Build a validator for one SETTINGS_SCHEMA entry, with the schema fields bound once.
+    
+    Args:
+        schema: Schema entry for the setting
+        
+    Returns:
+        Function mapping a value to (ok, value): ok is True if the value is valid as given;
+        otherwise value is a converted/clamped replacement or _USE_DEFAULT
+    """
+    expected_type = schema.get("type")
+    min_val = schema.get("min")
+    max_val = schema.get("max")
+    options = schema.get("options")
+    
+    def validate(value: Any) -> Tuple[bool, Any]:
+        ok = True
+        
+        # Type validation, converting where the intent is clear
+        if expected_type is not None and not isinstance(value, expected_type):
+            ok = False
+            try:
+                if expected_type is bool and isinstance(value, (int, str)):
+                    if isinstance(value, str):
+                        value = value.lower() in ('yes', 'true', 'y', '1')
+                    else:
+                        value = bool(value)
+                elif expected_type is int and isinstance(value, str):
+                    value = int(value)
+                elif expected_type is str:
+                    value = str(value)
+                else:
+                    return False, _USE_DEFAULT
+            except (ValueError, TypeError):
+                return False, _USE_DEFAULT
+                
+        # Range validation for numeric values
+        if min_val is not None and value < min_val:
+            return False, min_val
+        if max_val is not None and value > max_val:
+            return False, max_val
+            
+        # Options validation
+        if options is not None and value not in options:
+            return False, _USE_DEFAULT
+        return ok, value
+        
+    return validate
+
+# Key written alongside saved settings: "<SETTINGS_VERSION>:<digest of the other settings>",
+# so a later load can tell the file still holds exactly what was validated and saved
+VALIDATED_MARKER = "__validated_for"
+
+# Log records buffered in memory before being written to logs/app.log in one go
+LOG_BUFFER_CAPACITY = 256
+
+# Set once the root logger has been configured, so later managers don't redo it
+_LOGGING_CONFIGURED = False
+
+# Upper bound on threads copying backup entries during a cross-filesystem migration
+MIGRATION_COPY_WORKERS = 8
+
+def _copy_file_keep_mtime(src: str, dst: str) -> str:
+    """Copy file bytes (sendfile where available) and carry over the timestamps, skipping copy2's mode/flag work."""
+    shutil.copyfile(src, dst)
+    st = os.stat(src)
+    # Backup pruning orders versions by mtime, so it must survive the copy
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+    return dst
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    """Serialize settings to indented UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    # Default ensure_ascii escapes the rare non-ASCII character and keeps the encoder on its fast path
+    return json.dumps(data, indent=4).encode('ascii')
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes; raises json.JSONDecodeError (orjson's error subclasses it) on bad input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 class SettingsManager:
     """
     Comprehensive application settings manager with robust error handling,
     validation, and UI integration capabilities.
     """
     
+    # No per-instance __dict__; every attribute set in __init__ must be listed here
+    __slots__ = (
+        "settings_file", "app_name", "settings", "callbacks",
+        "_notify_queue", "_notify_thread", "_validators", "_required_keys",
+        "_cached_default_folder", "_cached_default_settings",
+        "_resolved_backup_folder", "_last_saved_hash",
+        "_schema_meta", "_all_settings_cache", "_migration_thread"
+    )
+    
     # Settings version for migration support
     SETTINGS_VERSION = 3  # Incremented for removing deprecated settings
     
@@ -26,6 +134,8 @@ class SettingsManager:
         "logging_enabled": {"type": bool, "required": True},
         "username": {"type": str, "required": True},
         "compress_backups": {"type": bool, "required": False},
+        "compression_level": {"type": int, "min": 0, "max": 9, "required": False},
+        "zstd_level": {"type": int, "min": 1, "max": 22, "required": False},
         "check_for_updates": {"type": bool, "required": False},
         "notification_level": {"type": str, "options": ["none", "minimal", "full"], "required": False},
         "settings_version": {"type": int, "required": False}
@@ -46,7 +156,38 @@ class SettingsManager:
         """
         self.settings_file = settings_file
         self.app_name = app_name
-        self.callbacks = []
+        # Registered listeners; a dict used as an insertion-ordered set
+        self.callbacks: Dict[Callable[[], None], None] = {}
+        
+        # Listener callbacks run on a background thread so slow listeners don't block set()
+        self._notify_queue = queue.SimpleQueue()
+        self._notify_thread: Optional[threading.Thread] = None
+        
+        # Per-key validators compiled from SETTINGS_SCHEMA
+        self._validators: Dict[str, Callable[[Any], Tuple[bool, Any]]] = {
+            key: _compile_validator(schema) for key, schema in self.SETTINGS_SCHEMA.items()
+        }
+        self._required_keys = frozenset(
+            key for key, schema in self.SETTINGS_SCHEMA.items() if schema.get("required", False)
+        )
+        
+        # Read-only schema entries handed to the UI, and the last get_all_settings() result
+        # with the settings dict it was built from
+        self._schema_meta = {key: MappingProxyType(schema) for key, schema in self.SETTINGS_SCHEMA.items()}
+        self._all_settings_cache: Optional[Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]] = None
+        
+        # Defaults resolved once (platform checks, home lookup and mkdir); cleared by reset_to_defaults
+        self._cached_default_folder: Optional[str] = None
+        self._cached_default_settings: Optional[Dict[str, Any]] = None
+        
+        # (backup_folder value, its resolved display form); re-resolved when the value changes
+        self._resolved_backup_folder: Optional[Tuple[str, str]] = None
+        
+        # Hash of the JSON last read from or written to settings_file, to skip identical rewrites
+        self._last_saved_hash: Optional[int] = None
+        
+        # Backup folder migration started by _load_settings, run in the background
+        self._migration_thread: Optional[threading.Thread] = None
         
         # Configure logging with rotation
         self._configure_logging()
@@ -58,16 +199,23 @@ class SettingsManager:
         self._ensure_directories()
     
     def _configure_logging(self) -> None:
-        """Configure application logging with rotation."""
+        """Configure application logging with rotation (once per process)."""
+        global _LOGGING_CONFIGURED
+        if _LOGGING_CONFIGURED:
+            return
+            
         log_dir = "logs"
         os.makedirs(log_dir, exist_ok=True)
         
         log_file = os.path.join(log_dir, "app.log")
         
-        handler = RotatingFileHandler(
+        # delay=True: the file isn't opened until the first record is written
+        file_handler = RotatingFileHandler(
             log_file,
             maxBytes=5*1024*1024,  # 5 MB
-            backupCount=3
+            backupCount=3,
+            delay=True,
+            encoding='utf-8'
         )
         
         # Use centralized time format for log timestamps
@@ -75,7 +223,10 @@ class SettingsManager:
             "%(asctime)s - %(levelname)s - %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S"
         )
-        handler.setFormatter(formatter)
+        file_handler.setFormatter(formatter)
+        
+        # Batch writes; warnings and errors (and logging.shutdown at exit) flush at once
+        handler = MemoryHandler(LOG_BUFFER_CAPACITY, flushLevel=logging.WARNING, target=file_handler)
         
         logger = logging.getLogger()
         logger.setLevel(logging.INFO)
@@ -85,23 +236,25 @@ class SettingsManager:
             logger.removeHandler(hdlr)
             
         logger.addHandler(handler)
+        _LOGGING_CONFIGURED = True
         
     def _ensure_directories(self) -> None:
         """Ensure all required directories exist."""
         # Ensure backup folder exists
         backup_folder = self.get("backup_folder")
         if backup_folder:
-            os.makedirs(backup_folder, exist_ok=True)
-            
-            # Create subdirectories
-            versions_dir = os.path.join(backup_folder, "versions")
-            temp_dir = os.path.join(backup_folder, "temp")
-            
-            os.makedirs(versions_dir, exist_ok=True)
-            os.makedirs(temp_dir, exist_ok=True)
+            # Creating the leaves creates the backup folder itself too
+            Path(backup_folder, "versions").mkdir(parents=True, exist_ok=True)
+            Path(backup_folder, "temp").mkdir(parents=True, exist_ok=True)
         
     def _get_default_backup_folder(self) -> str:
-        """Determine the default backup folder based on platform."""
+        """Determine the default backup folder based on platform (resolved once per manager)."""
+        if self._cached_default_folder is None:
+            self._cached_default_folder = self._resolve_default_backup_folder()
+        return self._cached_default_folder
+        
+    def _resolve_default_backup_folder(self) -> str:
+        """Pick and create the platform-specific default backup folder."""
         system = platform.system().lower()
         
         # Use platform-specific standard locations
@@ -132,7 +285,14 @@ class SettingsManager:
             return fallback_path
         
     def _get_default_settings(self) -> Dict[str, Any]:
-        """Get default settings with platform-specific adjustments."""
+        """Get a fresh copy of the default settings with platform-specific adjustments."""
+        if self._cached_default_settings is None:
+            self._cached_default_settings = self._build_default_settings()
+        # Callers keep and mutate the result (e.g. as self.settings)
+        return dict(self._cached_default_settings)
+        
+    def _build_default_settings(self) -> Dict[str, Any]:
+        """Build the default settings."""
         # Use centralized username function for better error handling
         username = get_current_username()
         
@@ -151,79 +311,131 @@ class SettingsManager:
         """Load settings with defaults and validation."""
         default_settings = self._get_default_settings()
 
-        if os.path.exists(self.settings_file):
-            try:
-                with open(self.settings_file, "r", encoding='utf-8') as f:
-                    settings = json.load(f)
-                    
-                    # Always update username to current user
-                    # Use centralized username function
-                    current_username = get_current_username()
-                    old_username = settings.get("username", "User")
-                    settings["username"] = current_username
-                    
-                    # Check for path with old username pattern
-                    current_backup_folder = settings.get("backup_folder", "")
-                    needs_migration = False
-                    old_backup_folder = None
+        try:
+            # Just try to read it; a missing file means first run
+            raw = Path(self.settings_file).read_bytes()
+            settings = _loads(raw)
+            self._last_saved_hash = hash(raw)
+            validated_for = settings.pop(VALIDATED_MARKER, None)
+            loaded_settings = dict(settings)
+            # A hand edit changes the digest, so edited values are validated like any others
+            trusted = validated_for is not None and validated_for == self._validation_stamp(loaded_settings)
+            
+            # Always update username to current user
+            # Use centralized username function
+            current_username = get_current_username()
+            old_username = settings.get("username", "User")
+            settings["username"] = current_username
+            
+            # Check for path with old username pattern
+            current_backup_folder = settings.get("backup_folder", "")
+            needs_migration = False
+            old_backup_folder = None
 
-                    # Fix paths with hardcoded "User" or paths with old usernames
-                    if "backups_User" in current_backup_folder:
-                        old_backup_folder = current_backup_folder
-                        # Get a proper default path instead 
-                        new_backup_folder = self._get_default_backup_folder()
-                        settings["backup_folder"] = new_backup_folder
-                        needs_migration = True
-                        logging.info(f"Fixing hardcoded backup folder: {old_backup_folder} -> {new_backup_folder}")
-                    elif f"backups_{old_username}" in current_backup_folder and old_username != current_username:
-                        old_backup_folder = current_backup_folder
-                        new_backup_folder = self._get_default_backup_folder()
-                        settings["backup_folder"] = new_backup_folder
-                        needs_migration = True
-                        logging.info(f"Updating username in backup folder: {old_backup_folder} -> {new_backup_folder}")
-                    
-                    # Schedule migration after settings are loaded
-                    # We'll migrate files if we changed paths and if old path exists
-                    if needs_migration and old_backup_folder and os.path.exists(old_backup_folder):
-                        self._migrate_backup_path(old_backup_folder, settings["backup_folder"])
-                    
-                    # Update with any missing defaults
-                    for key, value in default_settings.items():
-                        if key not in settings:
-                            settings[key] = value
-                    
-                    # Check for settings migration (version changes)
-                    if settings.get("settings_version", 0) < self.SETTINGS_VERSION:
-                        settings = self._migrate_settings(settings)
-                    
-                    # Remove deprecated settings
-                    settings = self._remove_deprecated_settings(settings)
-                    
-                    # Validate settings
-                    settings = self._validate_settings(settings)
-                    
-                    # Save updated settings
-                    self.save_settings(settings)
-                    return settings
-                    
-            except (json.JSONDecodeError, IOError) as e:
-                logging.error(f"Settings file error: {str(e)}. Resetting to defaults.")
-                return self._reset_settings()
+            # Fix paths with hardcoded "User" or paths with old usernames
+            if "backups_User" in current_backup_folder:
+                old_backup_folder = current_backup_folder
+                # Get a proper default path instead 
+                new_backup_folder = self._get_default_backup_folder()
+                settings["backup_folder"] = new_backup_folder
+                needs_migration = True
+                logging.info(f"Fixing hardcoded backup folder: {old_backup_folder} -> {new_backup_folder}")
+            elif f"backups_{old_username}" in current_backup_folder and old_username != current_username:
+                old_backup_folder = current_backup_folder
+                new_backup_folder = self._get_default_backup_folder()
+                settings["backup_folder"] = new_backup_folder
+                needs_migration = True
+                logging.info(f"Updating username in backup folder: {old_backup_folder} -> {new_backup_folder}")
+            
+            # Update with any missing defaults
+            for key, value in default_settings.items():
+                if key not in settings:
+                    settings[key] = value
+            
+            # Check for settings migration (version changes)
+            if settings.get("settings_version", 0) < self.SETTINGS_VERSION:
+                settings = self._migrate_settings(settings)
+            
+            # Remove deprecated settings
+            settings = self._remove_deprecated_settings(settings)
+            
+            # Validate settings, unless this exact content was validated before it was saved
+            if not trusted or settings != loaded_settings:
+                settings = self._validate_settings(settings)
+            
+            # Save only if loading changed anything (migration, defaults, fixes)
+            if settings != loaded_settings or not trusted:
+                self.save_settings(settings)
+                
+            # The new folder is saved; move the files over without holding up startup.
+            # Backups written there meanwhile are merged with the moved ones
+            # We'll migrate files if we changed paths and if old path exists
+            if needs_migration and old_backup_folder and os.path.exists(old_backup_folder):
+                self._start_migration(old_backup_folder, settings["backup_folder"])
+            return settings
+            
+        except FileNotFoundError:
+            return self._reset_settings()
+        except (json.JSONDecodeError, IOError) as e:
+            logging.error(f"Settings file error: {str(e)}. Resetting to defaults.")
+            return self._reset_settings()
+
+    def _validation_stamp(self, settings: Dict[str, Any]) -> str:
+        """
+        Get the VALIDATED_MARKER value for settings: the settings version and a digest of
+        their serialized form (stable across runs, unlike hash()).
+        """
+        digest = hashlib.blake2b(_dumps(settings), digest_size=16).hexdigest()
+        return f"{self.SETTINGS_VERSION}:{digest}"
 
-        return self._reset_settings()
-    
     def _remove_deprecated_settings(self, settings: Dict[str, Any]) -> Dict[str, Any]:
-        """Remove deprecated settings from the settings dictionary."""
+        """
+        Get the settings without deprecated keys.
+        
+        Returns the same dict when there is nothing to remove (the usual case), otherwise
+        a copy without them; the dict passed in is never modified.
+        """
+        if not any(key in settings for key in self.DEPRECATED_SETTINGS):
+            return settings
         for key in self.DEPRECATED_SETTINGS:
             if key in settings:
                 logging.info(f"Removing deprecated setting: {key}")
-                settings.pop(key, None)
-        return settings
+        return {key: value for key, value in settings.items() if key not in self.DEPRECATED_SETTINGS}
     
+    def _start_migration(self, old_path: str, new_path: str) -> None:
+        """Run _migrate_backup_path on a background thread."""
+        logging.info(f"Backup migration started in background: {old_path} -> {new_path}")
+        self._migration_thread = threading.Thread(
+            target=self._migrate_backup_path,
+            args=(old_path, new_path),
+            name="settings-migration",
+            daemon=True
+        )
+        self._migration_thread.start()
+        
+    @property
+    def is_migrating(self) -> bool:
+        """Whether backup files are still being moved to a new backup folder."""
+        return self._migration_thread is not None and self._migration_thread.is_alive()
+        
+    def wait_for_migration(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a background backup folder migration to finish.
+        
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+            
+        Returns:
+            bool: True if no migration is running anymore
+        """
+        if self._migration_thread is not None:
+            self._migration_thread.join(timeout)
+        return not self.is_migrating
+        
     def _migrate_backup_path(self, old_path: str, new_path: str) -> None:
         """
         Migrate backup files from old path to new path.
-        This is called during settings load if paths change.
+        Started in the background by _load_settings if paths change.
         """
         if old_path == new_path:
             return
@@ -231,95 +443,121 @@ class SettingsManager:
         logging.info(f"Starting backup migration: {old_path} -> {new_path}")
         
         try:
-            # Make sure target exists
-            os.makedirs(new_path, exist_ok=True)
-            
             old_versions_dir = os.path.join(old_path, "versions")
             new_versions_dir = os.path.join(new_path, "versions")
             
-            if os.path.exists(old_versions_dir):
-                # Create the versions directory at the new location
-                os.makedirs(new_versions_dir, exist_ok=True)
-                
-                # Copy all files and directories
-                for item in os.listdir(old_versions_dir):
-                    src_item = os.path.join(old_versions_dir, item)
-                    dst_item = os.path.join(new_versions_dir, item)
-                    
-                    if os.path.isdir(src_item):
-                        # Copy directory and all contents
-                        if not os.path.exists(dst_item):
-                            shutil.copytree(src_item, dst_item)
-                    else:
-                        # Copy file
-                        shutil.copy2(src_item, dst_item)
-                        
-                logging.info(f"Successfully migrated backup files from {old_path} to {new_path}")
-                
-                # Optionally clean up old directory after migration
-                # Uncomment if you want to automatically clean up:
-                # shutil.rmtree(old_path, ignore_errors=True)
-                # logging.info(f"Removed old backup folder: {old_path}")
-            else:
-                logging.info(f"No versions directory found at old path: {old_versions_dir}")
+            # The app is already writing to the new folder, so per-file folders there are merged
+            self._transfer_versions(old_versions_dir, new_versions_dir, merge_dirs=True)
+            logging.info(f"Successfully migrated backup files from {old_path} to {new_path}")
+            
+            # Optionally clean up old directory after migration
+            # Uncomment if you want to automatically clean up:
+            # shutil.rmtree(old_path, ignore_errors=True)
+            # logging.info(f"Removed old backup folder: {old_path}")
                 
+        except FileNotFoundError:
+            logging.info(f"No versions directory found at old path: {old_versions_dir}")
         except Exception as e:
             logging.error(f"Backup migration failed: {str(e)}")
         
+    def _transfer_versions(self, src_dir: str, dst_dir: str, merge_dirs: bool) -> None:
+        """
+        Move a versions directory to a new backup folder, copying only when a rename can't.
+        
+        Args:
+            src_dir: Existing versions directory
+            dst_dir: Versions directory in the new backup folder
+            merge_dirs: Copy into per-file folders that already exist at the target
+                (otherwise those folders are left as they are)
+        """
+        # Same filesystem: one rename moves the whole tree. An empty target left by
+        # folder setup is removed first, as Windows won't rename over a directory.
+        try:
+            os.rmdir(dst_dir)
+        except FileNotFoundError:
+            # Nothing at the target; rename still needs its parent
+            os.makedirs(os.path.dirname(dst_dir), exist_ok=True)
+        except OSError:
+            pass
+        try:
+            os.rename(src_dir, dst_dir)
+            logging.info(f"Moved versions directory: {src_dir} -> {dst_dir}")
+            return
+        except FileNotFoundError:
+            if not os.path.isdir(src_dir):
+                # Nothing to migrate; put back the target removed above
+                os.makedirs(dst_dir, exist_ok=True)
+                raise
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                logging.info(f"Cannot rename {src_dir} ({str(e)}); copying instead")
+        
+        # Different filesystem or occupied target: copy entries in parallel, as the
+        # time goes to waiting on the disks
+        os.makedirs(dst_dir, exist_ok=True)
+        pairs = []
+        with os.scandir(src_dir) as entries:
+            for entry in entries:
+                dst_item = os.path.join(dst_dir, entry.name)
+                # d_type from the listing on Linux; no stat per entry
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_dir and not merge_dirs and os.path.exists(dst_item):
+                    continue
+                pairs.append((entry.path, dst_item, is_dir))
+                
+        def copy_one(pair) -> List[Tuple[str, str, str]]:
+            src_item, dst_item, is_dir = pair
+            try:
+                if is_dir:
+                    shutil.copytree(src_item, dst_item, copy_function=_copy_file_keep_mtime, dirs_exist_ok=True)
+                else:
+                    _copy_file_keep_mtime(src_item, dst_item)
+                return []
+            except shutil.Error as e:
+                return list(e.args[0])
+            except OSError as e:
+                return [(src_item, dst_item, str(e))]
+                
+        errors = []
+        workers = min(MIGRATION_COPY_WORKERS, len(pairs)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for item_errors in executor.map(copy_one, pairs):
+                errors.extend(item_errors)
+        if errors:
+            # Report every entry that failed, not just the first
+            raise shutil.Error(errors)
+                    
+    @staticmethod
+    def _has_entries(directory: str) -> bool:
+        """Check that a directory exists and isn't empty, reading at most one entry."""
+        try:
+            with os.scandir(directory) as entries:
+                return next(entries, None) is not None
+        except (FileNotFoundError, NotADirectoryError):
+            return False
+            
     def _validate_settings(self, settings: Dict[str, Any]) -> Dict[str, Any]:
         """Validate settings against schema and fix any issues."""
         validated = {}
         default_settings = self._get_default_settings()
         
-        for key, schema in self.SETTINGS_SCHEMA.items():
-            # Check if required key is missing
-            if schema.get("required", False) and key not in settings:
-                validated[key] = default_settings.get(key)
-                logging.warning(f"Missing required setting '{key}'. Using default: {default_settings.get(key)}")
-                continue
-                
-            # If key is not in settings, skip validation
+        for key, validate in self._validators.items():
             if key not in settings:
+                # Check if required key is missing
+                if key in self._required_keys:
+                    validated[key] = default_settings.get(key)
+                    logging.warning(f"Missing required setting '{key}'. Using default: {default_settings.get(key)}")
                 continue
                 
-            value = settings[key]
-            
-            # Type validation
-            expected_type = schema.get("type")
-            if expected_type and not isinstance(value, expected_type):
-                try:
-                    # Try to convert
-                    if expected_type == bool and isinstance(value, (int, str)):
-                        if isinstance(value, str):
-                            value = value.lower() in ('yes', 'true', 'y', '1')
-                        else:
-                            value = bool(value)
-                    elif expected_type == int and isinstance(value, str):
-                        value = int(value)
-                    elif expected_type == str:
-                        value = str(value)
-                    else:
-                        value = default_settings.get(key)
-                        logging.warning(f"Invalid type for '{key}'. Using default: {value}")
-                except (ValueError, TypeError):
-                    value = default_settings.get(key)
-                    logging.warning(f"Could not convert '{key}'. Using default: {value}")
-            
-            # Range validation for numeric values
-            if expected_type == int:
-                min_val = schema.get("min")
-                max_val = schema.get("max")
-                if min_val is not None and value < min_val:
-                    value = min_val
-                    logging.warning(f"Value for '{key}' below minimum ({min_val}). Adjusted.")
-                if max_val is not None and value > max_val:
-                    value = max_val
-                    logging.warning(f"Value for '{key}' above maximum ({max_val}). Adjusted.")
-            
-            # Options validation
-            if "options" in schema and value not in schema["options"]:
-                value = default_settings.get(key)
-                logging.warning(f"Invalid option for '{key}'. Using default: {value}")
+            ok, value = validate(settings[key])
+            if not ok:
+                if value is _USE_DEFAULT:
+                    if key not in default_settings:
+                        # Optional setting without a default: drop it
+                        logging.warning(f"Invalid value for '{key}': {settings[key]!r}. Removed.")
+                        continue
+                    value = default_settings[key]
+                logging.warning(f"Invalid value for '{key}': {settings[key]!r}. Using: {value!r}")
             
             validated[key] = value
         
@@ -379,11 +617,34 @@ class SettingsManager:
             settings = self.settings
             
         # Remove deprecated settings before saving
-        settings = self._remove_deprecated_settings(settings.copy())
+        settings = self._remove_deprecated_settings(settings)
             
         try:
-            with open(self.settings_file, "w", encoding='utf-8') as f:
-                json.dump(settings, f, indent=4, ensure_ascii=False)
+            # Serialize before opening so the file is only held for the write itself
+            # Everything saved here has been validated (set/import/load all check first)
+            payload = _dumps({**settings, VALIDATED_MARKER: self._validation_stamp(settings)})
+            payload_hash = hash(payload)
+            if payload_hash == self._last_saved_hash:
+                # Same content as the file already holds
+                self.settings = settings
+                return True
+                
+            # Write a temp file and swap it in, so a crash mid-write can't leave a
+            # truncated settings file (which the next load would reset to defaults)
+            tmp_file = self.settings_file + ".tmp"
+            try:
+                with open(tmp_file, "wb") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.settings_file)
+            except OSError:
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
+                raise
+            self._last_saved_hash = payload_hash
             logging.info("Settings saved successfully")
             
             # Update internal settings
@@ -398,7 +659,12 @@ class SettingsManager:
             return False
             
     def get(self, key: str, default: Any = None) -> Any:
-        """Get a setting value with default fallback."""
+        """
+        Get a setting value with default fallback.
+        
+        Lock-free: writers never mutate self.settings in place, they build a new dict and
+        swap the reference, so a reader always sees one complete version.
+        """
         return self.settings.get(key, default)
         
     def set(self, key: str, value: Any) -> bool:
@@ -412,53 +678,76 @@ class SettingsManager:
         Returns:
             bool: True if the setting was changed, False otherwise
         """
-        # Check if key is deprecated
-        if key in self.DEPRECATED_SETTINGS:
-            logging.warning(f"Attempted to set deprecated setting: {key}")
-            return False
-            
-        # Check if key is in schema
-        if key not in self.SETTINGS_SCHEMA:
-            logging.warning(f"Attempted to set unknown setting: {key}")
+        if not self._is_settable(key, value):
             return False
             
         # Special handling for the backup folder
         if key == "backup_folder":
             return self.set_backup_folder(value)
+            
+        # Set and save: publish a new dict rather than mutating the one readers may hold
+        if self.settings.get(key) == value:
+            return False
+        self.settings = {**self.settings, key: value}
+        self.save_settings()
+        return True
         
-        # Validate value against schema
-        schema = self.SETTINGS_SCHEMA[key]
-        expected_type = schema.get("type")
+    def set_many(self, values: Dict[str, Any]) -> bool:
+        """
+        Set several settings and save them with a single write.
         
-        # Type check
-        if expected_type and not isinstance(value, expected_type):
-            logging.warning(f"Invalid type for setting '{key}'. Expected {expected_type}, got {type(value)}")
-            return False
+        Args:
+            values: Setting keys mapped to new values; invalid entries are skipped
             
-        # Range check for numeric values
-        if expected_type == int:
-            min_val = schema.get("min")
-            max_val = schema.get("max")
-            if min_val is not None and value < min_val:
-                logging.warning(f"Value for '{key}' below minimum ({min_val})")
-                return False
-            if max_val is not None and value > max_val:
-                logging.warning(f"Value for '{key}' above maximum ({max_val})")
-                return False
+        Returns:
+            bool: True if any setting was changed, False otherwise
+        """
+        changed = False
+        if "backup_folder" in values and self._is_settable("backup_folder", values["backup_folder"]):
+            # Moves data and saves on its own; done first so the dict built below includes it
+            changed = self.set_backup_folder(values["backup_folder"])
+            
+        updated = dict(self.settings)
+        for key, value in values.items():
+            if key == "backup_folder" or not self._is_settable(key, value):
+                continue
+            if updated.get(key) != value:
+                updated[key] = value
+                changed = True
                 
-        # Options check
-        if "options" in schema and value not in schema["options"]:
-            logging.warning(f"Invalid option for '{key}': {value}")
+        if updated != self.settings:
+            self.settings = updated
+            self.save_settings()
+        return changed
+        
+    def _is_settable(self, key: str, value: Any) -> bool:
+        """
+        Check a value for a setting against the schema, logging why it is rejected.
+        
+        Args:
+            key: Setting key to change
+            value: New value
+            
+        Returns:
+            bool: True if the value may be stored
+        """
+        # Check if key is deprecated
+        if key in self.DEPRECATED_SETTINGS:
+            logging.warning(f"Attempted to set deprecated setting: {key}")
             return False
             
-        # Set and save
-        changed = self.settings.get(key) != value
-        self.settings[key] = value
+        # Check if key is in schema
+        if key not in self.SETTINGS_SCHEMA:
+            logging.warning(f"Attempted to set unknown setting: {key}")
+            return False
         
-        if changed:
-            self.save_settings()
-            return True
-        return False
+        # Validate value against schema; set() rejects anything that would need fixing
+        ok, _ = self._validators[key](value)
+        if not ok:
+            logging.warning(f"Invalid value for setting '{key}': {value!r}")
+            return False
+            
+        return True
         
     def set_backup_folder(self, folder_path: str) -> bool:
         """
@@ -483,14 +772,9 @@ class SettingsManager:
             
         # Try to create the directory
         try:
-            os.makedirs(folder_path, exist_ok=True)
-            
-            # Create subdirectories
-            versions_dir = os.path.join(folder_path, "versions")
-            temp_dir = os.path.join(folder_path, "temp")
-            
-            os.makedirs(versions_dir, exist_ok=True)
-            os.makedirs(temp_dir, exist_ok=True)
+            # Creating the subdirectories creates the folder itself too
+            Path(folder_path, "versions").mkdir(parents=True, exist_ok=True)
+            Path(folder_path, "temp").mkdir(parents=True, exist_ok=True)
             
             # If we have existing data, migrate it
             old_folder = self.settings.get("backup_folder")
@@ -498,7 +782,7 @@ class SettingsManager:
                 self.migrate_backup_data(old_folder, folder_path)
             
             # Update setting
-            self.settings["backup_folder"] = folder_path
+            self.settings = {**self.settings, "backup_folder": folder_path}
             self.save_settings()
             
             logging.info(f"Backup folder changed to: {folder_path}")
@@ -526,22 +810,9 @@ class SettingsManager:
             # Get source subfolders
             source_versions = os.path.join(source_folder, "versions")
             
-            if os.path.exists(source_versions) and os.listdir(source_versions):
-                # Ensure target subfolder exists
+            if self._has_entries(source_versions):
                 target_versions = os.path.join(target_folder, "versions")
-                os.makedirs(target_versions, exist_ok=True)
-                
-                # Copy all files
-                for item in os.listdir(source_versions):
-                    item_path = os.path.join(source_versions, item)
-                    if os.path.isdir(item_path):
-                        shutil.copytree(
-                            item_path,
-                            os.path.join(target_versions, item),
-                            dirs_exist_ok=True
-                        )
-                    else:
-                        shutil.copy2(item_path, os.path.join(target_versions, item))
+                self._transfer_versions(source_versions, target_versions, merge_dirs=True)
                         
             logging.info(f"Successfully migrated backup data from {source_folder} to {target_folder}")
             return True
@@ -557,8 +828,7 @@ class SettingsManager:
         Args:
             callback: Function to call when settings change
         """
-        if callback not in self.callbacks:
-            self.callbacks.append(callback)
+        self.callbacks.setdefault(callback, None)
             
     def remove_listener(self, callback: Callable[[], None]) -> None:
         """
@@ -567,17 +837,48 @@ class SettingsManager:
         Args:
             callback: Function to remove from notifications
         """
-        if callback in self.callbacks:
-            self.callbacks.remove(callback)
+        self.callbacks.pop(callback, None)
             
     def _notify_listeners(self) -> None:
-        """Notify all listeners about settings changes."""
-        for callback in self.callbacks:
+        """
+        Queue a notification for all listeners about settings changes.
+        
+        Listeners run on the notifier thread, not the caller's; UI listeners must hand
+        their work to the UI thread themselves (e.g. with Tk's after()).
+        """
+        if not self.callbacks:
+            return
+        if self._notify_thread is None:
+            self._notify_thread = threading.Thread(target=self._run_listeners, name="settings-listeners", daemon=True)
+            self._notify_thread.start()
+        for callback in list(self.callbacks):
+            self._notify_queue.put(callback)
+            
+    def _run_listeners(self) -> None:
+        """Notifier thread: call queued listener callbacks in order."""
+        while True:
+            callback = self._notify_queue.get()
             try:
                 callback()
             except Exception as e:
                 logging.error(f"Error in settings listener: {str(e)}")
                 
+    def flush_listeners(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all listener notifications queued so far have run.
+        
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+            
+        Returns:
+            bool: True if the queue was drained in time
+        """
+        if self._notify_thread is None:
+            return True
+        done = threading.Event()
+        self._notify_queue.put(done.set)
+        return done.wait(timeout)
+                
     def reset_to_defaults(self) -> bool:
         """
         Reset settings to default values.
@@ -585,6 +886,9 @@ class SettingsManager:
         Returns:
             bool: True if reset was successful
         """
+        # Re-resolve defaults in case the environment changed since they were cached
+        self._cached_default_folder = None
+        self._cached_default_settings = None
         self.settings = self._get_default_settings()
         return self.save_settings()
         
@@ -600,10 +904,11 @@ class SettingsManager:
         """
         try:
             # Create a copy without deprecated settings
-            export_data = self._remove_deprecated_settings(self.settings.copy())
+            export_data = self._remove_deprecated_settings(self.settings)
             
-            with open(export_path, "w", encoding='utf-8') as f:
-                json.dump(export_data, f, indent=4, ensure_ascii=False)
+            payload = _dumps(export_data)
+            with open(export_path, "wb") as f:
+                f.write(payload)
                 
             logging.info(f"Settings exported to {export_path}")
             return True
@@ -623,8 +928,8 @@ class SettingsManager:
             bool: True if import was successful
         """
         try:
-            with open(import_path, "r", encoding='utf-8') as f:
-                imported_settings = json.load(f)
+            imported_settings = _loads(Path(import_path).read_bytes())
+            imported_settings.pop(VALIDATED_MARKER, None)
                 
             # Validate imported settings
             username = self.settings.get("username")  # Preserve current username
@@ -657,7 +962,11 @@ class SettingsManager:
         value = self.get(key)
         
         if key == "backup_folder":
-            return str(Path(value).resolve())
+            # resolve() hits the filesystem; only redo it when the folder setting changed
+            cached = self._resolved_backup_folder
+            if cached is None or cached[0] != value:
+                cached = self._resolved_backup_folder = (value, str(Path(value).resolve()))
+            return cached[1]
             
         elif key == "max_backups":
             return f"{value} versions"
@@ -680,16 +989,22 @@ class SettingsManager:
         Get all settings with metadata for UI display.
         
         Returns:
-            Dict containing all settings with their metadata
+            Dict containing all settings with their metadata; shared between calls
+            until a setting changes, so treat it as read-only
         """
-        result = {}
-        
-        for key in self.SETTINGS_SCHEMA.keys():
-            if key in self.settings:
-                result[key] = {
-                    "value": self.settings[key],
-                    "display_value": self.get_ui_friendly_value(key),
-                    "schema": self.SETTINGS_SCHEMA.get(key, {})
-                }
-                
+        settings = self.settings
+        cached = self._all_settings_cache
+        # Settings are replaced, never mutated, so an unchanged dict means an unchanged result
+        if cached is not None and cached[0] is settings:
+            return cached[1]
+            
+        result = {
+            key: {
+                "value": settings[key],
+                "display_value": self.get_ui_friendly_value(key),
+                "schema": schema
+            }
+            for key, schema in self._schema_meta.items() if key in settings
+        }
+        self._all_settings_cache = (settings, result)
         return result
\ No newline at end of file
@@ -2,11 +2,80 @@
 
 import os
 import json
-import hashlib
+import time
+import threading
 from datetime import datetime
 import pytz
 from typing import Dict, Any, Optional, List, Tuple
 
+# Optional fast JSON codec; the stdlib json module is used when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from utils.file_utils import calculate_file_hash
+from utils.time_utils import get_current_username
+
+# A file modified this recently may still change within the same mtime tick, so its
+# stat fields aren't trusted to identify the hashed contents
+RACY_MTIME_WINDOW_NS = 2 * 10**9
+
+# Journal records appended after tracked_files.json before it is rewritten in full
+JOURNAL_COMPACT_RECORDS = 100
+
+# Key in tracked_files.json holding its generation; journal records carry the generation of
+# the snapshot they apply to, so ones already folded into a newer snapshot are skipped
+GENERATION_KEY = "__generation__"
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    """Serialize tracked files data to indented UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=4, ensure_ascii=False).encode('utf-8')
+
+def _dumps_record(record: Dict[str, Any]) -> bytes:
+    """Serialize a journal record to one line of compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n"
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes; raises json.JSONDecodeError (orjson's error subclasses it) on bad input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _is_journal_record(record: Any) -> bool:
+    """Check that a parsed journal line has the shape save_tracked_files() writes."""
+    return (
+        isinstance(record, dict)
+        and isinstance(record.get("path"), str)
+        and isinstance(record.get("generation"), int)
+        and (record.get("entry") is None or isinstance(record["entry"], dict))
+    )
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    """Get (mtime_ns, size) of a file, or None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _copy_tracked_files(tracked_files: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy tracked files data deep enough for callers to add, replace and remove files and
+    versions. Version entries themselves are shared; they are only ever replaced whole.
+    """
+    copied = {}
+    for path, file_entry in tracked_files.items():
+        file_entry = dict(file_entry)
+        if "versions" in file_entry:
+            file_entry["versions"] = dict(file_entry["versions"])
+        copied[path] = file_entry
+    return copied
+
 class VersionManager:
     """Manages file versioning and history."""
     
@@ -14,39 +83,75 @@ class VersionManager:
         self.backup_folder = backup_folder
         os.makedirs(backup_folder, exist_ok=True)
         self.tracked_files_path = "tracked_files.json"
+        # Changes since tracked_files.json was last written, one file entry per line
+        self.journal_path = "tracked_files.jsonl"
+        # Path -> (hash, mtime_ns, size) for the last has_file_changed() hash, stat'ed before
+        # hashing; recorded on the version by add_version() so later checks can skip hashing
+        self._hashed_fingerprints: Dict[str, Tuple[str, int, int]] = {}
+        # (stat keys of tracked_files.json and the journal, data read from them); callers get copies
+        self._tracked_files_cache: Optional[Tuple[Tuple, Dict[str, Any]]] = None
+        self._journal_records = 0
+        # Generation of the snapshot new journal records apply to
+        self._generation = 0
+        # Serializes reading, appending to and compacting the journal
+        self._tracked_files_lock = threading.Lock()
+        
+        # Resolved once for _log_error; os.getlogin() is a syscall and raises without a login terminal
+        self._error_log_path = os.path.join(os.getcwd(), "error_log.txt")
+        self._username = get_current_username()
         
     def calculate_file_hash(self, file_path: str) -> str:
-        """Calculate SHA-256 hash of file contents."""
+        """Calculate SHA-256 hash of file contents, streamed so large files aren't read whole."""
         try:
-            with open(file_path, 'rb') as f:
-                return hashlib.sha256(f.read()).hexdigest()
+            return calculate_file_hash(file_path)
         except Exception as e:
             self._log_error(f"Failed to calculate file hash: {str(e)}")
             raise
     
-    def has_file_changed(self, file_path: str, tracked_files: Dict[str, Any]) -> Tuple[bool, str, str]:
+    def has_file_changed(self, file_path: str, tracked_files: Dict[str, Any],
+                         trust_mtime: bool = True) -> Tuple[bool, str, str]:
         """
         Check if file has changed from its last tracked version.
+        
+        Args:
+            file_path: Path to the file
+            tracked_files: Tracked files data
+            trust_mtime: Treat the file as unchanged without hashing it when its size and
+                modification time match those recorded for the last version
+                
         Returns (has_changed, current_hash, last_hash)
         """
         try:
-            current_hash = self.calculate_file_hash(file_path)
             normalized_path = os.path.normpath(file_path)
+            file_entry = tracked_files.get(normalized_path, {})
+            versions = file_entry.get("versions", {})
             
-            if normalized_path not in tracked_files:
-                return True, current_hash, ""
+            latest_version = None
+            latest = file_entry.get("latest")
+            if latest and latest.get("hash") in versions:
+                # Pointer kept by add_version()
+                latest_version = (latest["hash"], versions[latest["hash"]])
+            elif versions:
+                # Get most recent version hash; "%Y-%m-%d %H:%M:%S" strings sort chronologically
+                latest_version = max(versions.items(), key=lambda x: x[1]["timestamp"])
                 
-            versions = tracked_files[normalized_path].get("versions", {})
-            if not versions:
-                return True, current_hash, ""
+            # Stat before hashing, so the fingerprint can't describe newer contents than the hash
+            stat = os.stat(file_path)
+            if (trust_mtime and latest_version is not None
+                    and latest_version[1].get("mtime_ns") == stat.st_mtime_ns
+                    and latest_version[1].get("size") == stat.st_size):
+                last_hash = latest_version[0]
+                return False, last_hash, last_hash
                 
-            # Get most recent version hash
-            latest_version = sorted(
-                versions.items(),
-                key=lambda x: datetime.strptime(x[1]["timestamp"], "%Y-%m-%d %H:%M:%S"),
-                reverse=True
-            )[0]
+            current_hash = self.calculate_file_hash(file_path)
+            if time.time_ns() - stat.st_mtime_ns > RACY_MTIME_WINDOW_NS:
+                self._hashed_fingerprints[normalized_path] = (current_hash, stat.st_mtime_ns, stat.st_size)
+            else:
+                self._hashed_fingerprints.pop(normalized_path, None)
             
+            if latest_version is None:
+                return True, current_hash, ""
+                
             last_hash = latest_version[0]
             return current_hash != last_hash, current_hash, last_hash
             
@@ -54,25 +159,187 @@ class VersionManager:
             self._log_error(f"Failed to check file changes: {str(e)}")
             raise
     
+    def add_version(self, tracked_files: Dict[str, Any], file_path: str, file_hash: str,
+                    version_info: Dict[str, Any]) -> None:
+        """
+        Record a committed version in tracked files data (saved by the caller).
+        
+        Args:
+            tracked_files: Tracked files data to update
+            file_path: Path to the committed file
+            file_hash: Hash of the committed contents, from has_file_changed()
+            version_info: Version entry (timestamp, commit_message, username, ...)
+        """
+        normalized_path = os.path.normpath(file_path)
+        entry = dict(version_info)
+        
+        # Keep the stat fields seen when this hash was computed, for has_file_changed()
+        fingerprint = self._hashed_fingerprints.get(normalized_path)
+        if fingerprint is not None and fingerprint[0] == file_hash:
+            entry["mtime_ns"] = fingerprint[1]
+            entry["size"] = fingerprint[2]
+            
+        file_entry = tracked_files.setdefault(normalized_path, {"versions": {}})
+        file_entry.setdefault("versions", {})[file_hash] = entry
+        
+        # Point at the newest version so has_file_changed() needn't scan them all
+        latest = file_entry.get("latest")
+        timestamp = entry.get("timestamp", "")
+        if not latest or timestamp >= latest.get("timestamp", ""):
+            file_entry["latest"] = {"hash": file_hash, "timestamp": timestamp}
+    
     def load_tracked_files(self) -> Dict[str, Any]:
-        """Load tracked files from JSON."""
+        """Load tracked files from JSON and its journal, reading them again only when they have changed."""
+        with self._tracked_files_lock:
+            return _copy_tracked_files(self._read_tracked_files())
+            
+    def _read_tracked_files(self) -> Dict[str, Any]:
+        """
+        Get the current tracked files data (shared; not to be modified). Caller holds the lock.
+        
+        tracked_files.json is the last full snapshot; each journal line of its generation
+        then replaces or (with a null entry) removes one file's entry.
+        """
+        file_key = (_stat_key(self.tracked_files_path), _stat_key(self.journal_path))
+        cache = self._tracked_files_cache
+        if cache is not None and cache[0] == file_key:
+            return cache[1]
+            
+        tracked_files = {}
+        generation = 0
+        journal_records = 0
         try:
-            with open(self.tracked_files_path, "r", encoding='utf-8') as file:
-                return json.load(file)
+            with open(self.tracked_files_path, "rb") as file:
+                tracked_files = _loads(file.read())
+            if not isinstance(tracked_files, dict):
+                raise json.JSONDecodeError("Expected an object", "", 0)
+            generation = tracked_files.pop(GENERATION_KEY, 0)
         except FileNotFoundError:
-            return {}
+            pass
         except json.JSONDecodeError:
             self._log_error("Error: tracked_files.json is corrupted.")
-            return {}
+            tracked_files = {}
+            # Rewrite the snapshot on the next save
+            journal_records = JOURNAL_COMPACT_RECORDS
+            
+        try:
+            with open(self.journal_path, "rb") as journal:
+                data = journal.read()
+        except FileNotFoundError:
+            data = b""
+            
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            # Torn last line from a crash mid-append; cut it off so the next append
+            # starts on a fresh line instead of continuing the fragment
+            try:
+                os.truncate(self.journal_path, complete)
+                file_key = (file_key[0], _stat_key(self.journal_path))
+            except OSError as e:
+                self._log_error(f"Failed to truncate torn tracked files journal: {str(e)}")
+                
+        for line in data[:complete].splitlines():
+            try:
+                record = _loads(line)
+            except json.JSONDecodeError:
+                continue
+            # Records from before the last compaction are already in the snapshot
+            if not _is_journal_record(record) or record["generation"] != generation:
+                continue
+            if record["entry"] is None:
+                tracked_files.pop(record["path"], None)
+            else:
+                tracked_files[record["path"]] = record["entry"]
+            journal_records += 1
+            
+        self._generation = generation
+        self._journal_records = journal_records
+        self._tracked_files_cache = (file_key, tracked_files)
+        return tracked_files
     
     def save_tracked_files(self, tracked_files: Dict[str, Any]) -> None:
-        """Save tracked files to JSON with proper formatting."""
+        """
+        Save tracked files, appending only the changed file entries to the journal and
+        rewriting tracked_files.json once the journal grows past JOURNAL_COMPACT_RECORDS.
+        """
         try:
-            with open(self.tracked_files_path, "w", encoding='utf-8') as file:
-                json.dump(tracked_files, file, indent=4, ensure_ascii=False)
+            with self._tracked_files_lock:
+                self._save_tracked_files(tracked_files)
         except Exception as e:
             self._log_error(f"Failed to save tracked files: {str(e)}")
             raise
+            
+    def remove_versions(self, file_path: str, file_hashes: List[str]) -> None:
+        """
+        Remove version entries of a file from the tracked files on disk.
+        
+        Reading and saving happen under one hold of the lock, so versions saved by others
+        meanwhile are neither lost nor brought back.
+        """
+        normalized_path = os.path.normpath(file_path)
+        try:
+            with self._tracked_files_lock:
+                current = self._read_tracked_files()
+                file_entry = current.get(normalized_path)
+                versions = file_entry.get("versions", {}) if file_entry else {}
+                if not any(file_hash in versions for file_hash in file_hashes):
+                    return
+                    
+                # Replace just this file's entry; the cached data is shared and not modified
+                tracked_files = dict(current)
+                tracked_files[normalized_path] = dict(file_entry, versions={
+                    file_hash: version for file_hash, version in versions.items()
+                    if file_hash not in file_hashes
+                })
+                self._save_tracked_files(tracked_files)
+        except Exception as e:
+            self._log_error(f"Failed to remove versions: {str(e)}")
+            raise
+            
+    def _save_tracked_files(self, tracked_files: Dict[str, Any]) -> None:
+        """Write tracked files changed from the current data, see save_tracked_files. Caller holds the lock."""
+        previous = self._read_tracked_files()
+        generation = self._generation
+        records = [
+            {"path": path, "entry": file_entry, "generation": generation}
+            for path, file_entry in tracked_files.items()
+            if previous.get(path) != file_entry
+        ]
+        records.extend(
+            {"path": path, "entry": None, "generation": generation}
+            for path in previous if path not in tracked_files
+        )
+        
+        if self._journal_records + len(records) >= JOURNAL_COMPACT_RECORDS:
+            self._write_snapshot(tracked_files)
+        elif records:
+            with open(self.journal_path, "ab") as journal:
+                journal.write(b"".join(_dumps_record(record) for record in records))
+                journal.flush()
+                os.fsync(journal.fileno())
+            self._journal_records += len(records)
+            
+        file_key = (_stat_key(self.tracked_files_path), _stat_key(self.journal_path))
+        self._tracked_files_cache = (file_key, _copy_tracked_files(tracked_files))
+            
+    def _write_snapshot(self, tracked_files: Dict[str, Any]) -> None:
+        """Atomically rewrite tracked_files.json in full and empty the journal. Caller holds the lock."""
+        generation = self._generation + 1
+        tmp_path = self.tracked_files_path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(_dumps({**tracked_files, GENERATION_KEY: generation}))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.tracked_files_path)
+        self._generation = generation
+        
+        # The journal's records are all of the previous generation, so if a crash leaves
+        # it behind they are skipped rather than replayed over the newer snapshot
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+        self._journal_records = 0
     
     def get_backup_path(self, file_path: str, file_hash: str) -> str:
         """Construct the backup file path."""
@@ -82,24 +349,18 @@ class VersionManager:
         return os.path.join(version_dir, f"{file_hash}.gz")
     
     def get_backup_count(self, file_path: str) -> int:
-        """Get the current number of backups for a file."""
+        """Get the current number of backups for a file (its tracked versions; pruning removes both)."""
         try:
             normalized_path = os.path.normpath(file_path)
-            base_name = os.path.basename(normalized_path)
-            version_dir = os.path.join(self.backup_folder, "versions", base_name)
-            
-            if not os.path.exists(version_dir):
-                return 0
-                
-            return len([f for f in os.listdir(version_dir) if f.endswith('.gz')])
+            with self._tracked_files_lock:
+                file_entry = self._read_tracked_files().get(normalized_path, {})
+                return len(file_entry.get("versions", {}))
         except Exception:
             return 0
     
     def _log_error(self, error_message: str) -> None:
         """Log error messages with UTC timestamp."""
-        log_file_path = os.path.join(os.getcwd(), "error_log.txt")
         current_time = datetime.now(pytz.UTC).strftime("%Y-%m-%d %H:%M:%S")
-        username = os.getlogin()
         
-        with open(log_file_path, "a", encoding='utf-8') as log_file:
-            log_file.write(f"[{current_time}] [{username}] {error_message}\n")
\ No newline at end of file
+        with open(self._error_log_path, "a", encoding='utf-8') as log_file:
+            log_file.write(f"[{current_time}] [{self._username}] {error_message}\n")
\ No newline at end of file
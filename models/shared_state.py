@@ -1,19 +1,33 @@
 import os
+import time
+import threading
+from collections import OrderedDict
 from typing import Optional, List, Callable, Dict, Set, Any
 
 # Updated imports to use all centralized time utilities
 from utils.time_utils import get_current_times, get_formatted_time, get_current_username
 
+# Maximum number of raw -> normalized path entries kept by SharedState._norm
+NORM_CACHE_LIMIT = 4096
+
+# Seconds the selected file is trusted to still exist before checking the disk again
+SELECTED_FILE_CHECK_TTL = 0.5
+
+# Seconds pending-change tray notifications are held back so a burst sends just one
+TRAY_NOTIFY_DELAY = 0.05
+
 class SharedState:
     """Shared state to synchronize file selection, version updates, and system tray across the app."""
     def __init__(self):
         self.selected_file: Optional[str] = None
+        self._selected_file_checked_until = 0.0  # time.monotonic() deadline for the exists check
+        self._norm_cache: Dict[str, str] = {}
         self.file_callbacks: List[Callable[[Optional[str]], None]] = []
         self.version_callbacks: List[Callable[[], None]] = []
         self.last_update: Optional[str] = None  # Now using string format from time utils
         self.current_user: str = get_current_username()  # Using centralized username function
         self._active = True
-        self._file_history: List[str] = []  # Track file selection history
+        self._file_history: "OrderedDict[str, None]" = OrderedDict()  # Track file selection history, oldest first
         self._max_history = 10  # Maximum number of files to remember
         
         # File monitoring related attributes
@@ -24,6 +38,8 @@ class SharedState:
         # System tray integration
         self.system_tray_callbacks: List[Callable[[Dict[str, Any]], None]] = []
         self.pending_changes: Dict[str, Dict] = {}  # Track files with pending changes
+        self._tray_timer: Optional[threading.Timer] = None  # Armed while a coalesced update is due
+        self._tray_lock = threading.Lock()
         self.main_app = None  # Will hold reference to main application
         
         # Initialize with current time
@@ -33,9 +49,24 @@ class SharedState:
         # Flag for app shutdown state
         self.is_exiting = False
 
+    def _norm(self, path: str) -> str:
+        """Normalize a path, reusing the result for paths seen before."""
+        normalized_path = self._norm_cache.get(path)
+        if normalized_path is None:
+            normalized_path = os.path.normpath(path)
+            if len(self._norm_cache) < NORM_CACHE_LIMIT:
+                self._norm_cache[path] = normalized_path
+        return normalized_path
+
     def get_selected_file(self) -> Optional[str]:
         """Get the currently selected file path."""
-        if self.selected_file and os.path.exists(self.selected_file):
+        if not self.selected_file:
+            return None
+        now = time.monotonic()
+        if now < self._selected_file_checked_until:
+            return self.selected_file
+        if os.path.exists(self.selected_file):
+            self._selected_file_checked_until = now + SELECTED_FILE_CHECK_TTL
             return self.selected_file
         return None
 
@@ -46,18 +77,20 @@ class SharedState:
         Args:
             file_path: The path to the selected file or None if no file is selected
         """
+        self._selected_file_checked_until = 0.0
         if file_path is None:
             self.selected_file = None
         else:
             try:
-                normalized_path = os.path.normpath(file_path)
+                normalized_path = self._norm(file_path)
                 if os.path.exists(normalized_path):
                     self.selected_file = normalized_path
-                    # Add to history if it's a new file
-                    if normalized_path not in self._file_history:
-                        self._file_history.append(normalized_path)
-                        if len(self._file_history) > self._max_history:
-                            self._file_history.pop(0)
+                    self._selected_file_checked_until = time.monotonic() + SELECTED_FILE_CHECK_TTL
+                    # Move to the newest end of the history, dropping the oldest if over the limit
+                    self._file_history.pop(normalized_path, None)
+                    self._file_history[normalized_path] = None
+                    if len(self._file_history) > self._max_history:
+                        self._file_history.popitem(last=False)
                 else:
                     print(f"Warning: File does not exist: {normalized_path}")
                     self.selected_file = None
@@ -75,29 +108,31 @@ class SharedState:
     def track_file(self, file_path: str) -> None:
         """Add a file to tracking system."""
         if file_path and os.path.exists(file_path):
-            normalized_path = os.path.normpath(file_path)
+            normalized_path = self._norm(file_path)
             self.tracked_files.add(normalized_path)
             if self.file_monitor:
                 self.file_monitor.set_file(normalized_path)
                 self.file_monitor.refresh_tracked_files()
+            self.notify_tracking_change()
 
     def untrack_file(self, file_path: str) -> None:
         """Remove a file from tracking system."""
         if file_path:
-            normalized_path = os.path.normpath(file_path)
+            normalized_path = self._norm(file_path)
             self.tracked_files.discard(normalized_path)
             if self.file_monitor:
-                self.file_monitor._cleanup_file(normalized_path)
+                self.file_monitor.unwatch(normalized_path)
                 
             # Also remove from pending changes if present
             if normalized_path in self.pending_changes:
                 del self.pending_changes[normalized_path]
-                self._notify_system_tray_update()
+                self._schedule_system_tray_update()
+            self.notify_tracking_change()
 
     def is_file_tracked(self, file_path: str) -> bool:
         """Check if a file is being tracked."""
         if file_path:
-            normalized_path = os.path.normpath(file_path)
+            normalized_path = self._norm(file_path)
             return normalized_path in self.tracked_files
         return False
 
@@ -125,7 +160,7 @@ class SharedState:
         if not file_path:
             return
             
-        normalized_path = os.path.normpath(file_path)
+        normalized_path = self._norm(file_path)
         
         # Check if this file is being tracked before adding to pending changes
         if normalized_path in self.tracked_files:
@@ -140,17 +175,17 @@ class SharedState:
                 self.pending_changes[normalized_path]['last_updated'] = times['utc']
                 
             # Notify system tray of change
-            self._notify_system_tray_update()
+            self._schedule_system_tray_update()
 
     def clear_pending_change(self, file_path: str) -> None:
         """Clear a specific file from pending changes (e.g., after commit)."""
         if not file_path:
             return
             
-        normalized_path = os.path.normpath(file_path)
+        normalized_path = self._norm(file_path)
         if normalized_path in self.pending_changes:
             del self.pending_changes[normalized_path]
-            self._notify_system_tray_update()
+            self._schedule_system_tray_update()
 
     def get_pending_changes_count(self) -> int:
         """Get count of files with pending changes for system tray."""
@@ -173,6 +208,9 @@ class SharedState:
         """Notify system tray about status changes."""
         self._notify_system_tray_update(status)
         
+    def notify_tracking_change(self) -> None:
+        """Notify that a file was tracked or untracked (the app replaces this to refresh its tray menu)."""
+        
     def notify_version_commit(self) -> None:
         """
         Notify that a file has been committed to update the system tray recent files.
@@ -191,6 +229,24 @@ class SharedState:
                 except Exception as e:
                     print(f"Error refreshing tray menu after commit: {str(e)}")
 
+    def _schedule_system_tray_update(self) -> None:
+        """Notify system tray callbacks shortly, once for all pending-change updates until then."""
+        if not self._active or self.is_exiting:
+            return
+            
+        with self._tray_lock:
+            if self._tray_timer is not None:
+                return
+            self._tray_timer = threading.Timer(TRAY_NOTIFY_DELAY, self._flush_system_tray_update)
+            self._tray_timer.daemon = True
+            self._tray_timer.start()
+
+    def _flush_system_tray_update(self) -> None:
+        """Send the coalesced system tray notification with the status as it is now."""
+        with self._tray_lock:
+            self._tray_timer = None
+        self._notify_system_tray_update()
+
     def _notify_system_tray_update(self, status: Optional[Dict[str, Any]] = None) -> None:
         """Internal method to notify system tray callbacks with current status."""
         if not self._active or self.is_exiting:
@@ -311,7 +367,7 @@ class SharedState:
     def update_after_commit(self, file_path: str) -> None:
         """Update state after a successful commit."""
         if file_path:
-            normalized_path = os.path.normpath(file_path)
+            normalized_path = self._norm(file_path)
             # Clear from pending changes
             self.clear_pending_change(normalized_path)
             # Notify version callbacks and system tray
@@ -4,11 +4,11 @@ from datetime import datetime
 from utils.time_utils import get_current_times, get_current_username
 
 class QuickCommitDialog:
-    def __init__(self, file_path, settings, shared_state, version_manager, backup_manager, 
+    def __init__(self, file_path, settings_manager, shared_state, version_manager, backup_manager, 
                  colors=None, ui_scale=1.0, font_scale=1.0, icon_path="resources/icons/inveni_icon.ico"):
         """Streamlined commit dialog with clickable last commit display."""
         self.file_path = file_path
-        self.settings = settings
+        self.settings_manager = settings_manager
         self.shared_state = shared_state
         self.version_manager = version_manager
         self.backup_manager = backup_manager
@@ -445,7 +445,8 @@ class QuickCommitDialog:
             self.backup_manager.create_backup(
                 self.file_path,
                 current_hash,
-                self.settings
+                self.settings_manager.settings,
+                tracked_files
             )
             
             # Get file info - use the times we already have
@@ -466,16 +467,13 @@ class QuickCommitDialog:
                 }
             
             # Update tracked files
-            if normalized_path not in tracked_files:
-                tracked_files[normalized_path] = {"versions": {}}
-                
-            tracked_files[normalized_path]["versions"][current_hash] = {
+            self.version_manager.add_version(tracked_files, normalized_path, current_hash, {
                 "timestamp": self.current_time,
                 "commit_message": message,
                 "username": self.username,
                 "metadata": metadata,
                 "previous_hash": last_hash
-            }
+            })
             
             # Save changes
             self.version_manager.save_tracked_files(tracked_files)
@@ -85,7 +85,6 @@ class MainWindow:
         """Initialize main window and UI components."""
         self.root = root
         self.settings_manager = settings_manager
-        self.settings = settings_manager.settings
         self.shared_state = shared_state
         self.version_manager = version_manager
         self.backup_manager = backup_manager
@@ -564,7 +563,7 @@ class MainWindow:
         try:
             QuickCommitDialog(
                 file_path,
-                self.settings,
+                self.settings_manager,
                 self.shared_state,
                 self.version_manager,
                 self.backup_manager,
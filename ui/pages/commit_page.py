@@ -78,7 +78,6 @@ class CommitPage:
         self.version_manager = version_manager
         self.backup_manager = backup_manager
         self.settings_manager = settings_manager
-        self.settings = settings_manager.settings
         self.shared_state = shared_state
         self.ui_scale = ui_scale
         self.font_scale = font_scale
@@ -122,7 +121,7 @@ class CommitPage:
         self.current_layout = "wide"
         
         # Get settings
-        self.backup_folder = self.settings.get("backup_folder", "backups")
+        self.backup_folder = self.settings_manager.get("backup_folder", "backups")
         os.makedirs(self.backup_folder, exist_ok=True)
         
         # Set up UI components
@@ -709,17 +708,7 @@ class CommitPage:
 
     def _get_backup_count(self, file_path):
         """Get actual backup count for a file."""
-        try:
-            normalized_path = os.path.normpath(file_path)
-            tracked_files = self.version_manager.load_tracked_files()
-            
-            if normalized_path in tracked_files:
-                # Count the versions in the tracked file data
-                versions = tracked_files[normalized_path].get("versions", {})
-                return len(versions)
-            return 0
-        except Exception:
-            return 0
+        return self.version_manager.get_backup_count(file_path)
 
     def _reset_form(self):
         """Reset the commit form."""
@@ -893,7 +882,7 @@ class CommitPage:
             # Get the actual backup count from the version manager
             current_backups = self._get_backup_count(file_path)
             # Get max backups from settings as requested
-            max_backups = self.settings.get('max_backups', 5)
+            max_backups = self.settings_manager.get('max_backups', 5)
             
             category = self.type_handler.get_file_category(file_path)
             category_icon = self.type_handler.get_category_icon(category)
@@ -1107,7 +1096,8 @@ class CommitPage:
             backup_path = self.backup_manager.create_backup(
                 self.selected_file, 
                 current_hash, 
-                self.settings
+                self.settings_manager.settings,
+                tracked_files
             )
             
             # Get metadata
@@ -1118,16 +1108,13 @@ class CommitPage:
             # Update tracked files
             is_first_commit = normalized_path not in tracked_files
             
-            if is_first_commit:
-                tracked_files[normalized_path] = {"versions": {}}
-
-            tracked_files[normalized_path]["versions"][current_hash] = {
+            self.version_manager.add_version(tracked_files, normalized_path, current_hash, {
                 "timestamp": times['utc'],
                 "commit_message": commit_message,
                 "username": self.username,
                 "metadata": metadata,
                 "previous_hash": last_hash
-            }
+            })
             
             # Save tracked files
             self.version_manager.save_tracked_files(tracked_files)
@@ -1,12 +1,12 @@
 import os
 import tkinter as tk
 from tkinter import messagebox, ttk
-from datetime import datetime 
+from datetime import timedelta
 import threading
 import time
 
 # Updated imports for new project structure
-from utils.file_utils import format_size, calculate_file_hash
+from utils.file_utils import format_size
 from utils.time_utils import get_current_times, get_current_username, format_timestamp_dual, format_date_for_display
 
 class ToolTip:
@@ -90,7 +90,6 @@ class RestorePage:
         self.version_manager = version_manager
         self.backup_manager = backup_manager
         self.settings_manager = settings_manager
-        self.settings = settings_manager.settings
         self.shared_state = shared_state
         self.ui_scale = ui_scale
         self.font_scale = font_scale
@@ -127,7 +126,7 @@ class RestorePage:
 
         # Initialize state
         self.selected_file = shared_state.get_selected_file()
-        self.backup_folder = self.settings.get("backup_folder", "backups")
+        self.backup_folder = self.settings_manager.get("backup_folder", "backups")
         self.username = get_current_username()  # Use time_utils instead of os.getlogin()
         self.tooltip_window = None
         self.loading = False
@@ -706,7 +705,9 @@ class RestorePage:
             return
 
         filtered_versions = []
-        current_time = get_current_times()["utc"]
+        # Versions at least 8 whole days old are filtered out of "Last 7 Days"; timestamps
+        # are "%Y-%m-%d %H:%M:%S" strings, which compare chronologically without parsing
+        week_cutoff = (get_current_times()["datetime_utc"] - timedelta(days=8)).strftime("%Y-%m-%d %H:%M:%S")
 
         for version_hash, info in self.versions_data:
             # Apply filters
@@ -714,14 +715,10 @@ class RestorePage:
                 continue
 
             if filter_option == "Last 7 Days":
-                # Check if version is within last 7 days (use time_utils)
-                try:
-                    time_diff_days = (datetime.strptime(current_time, "%Y-%m-%d %H:%M:%S") - 
-                                     datetime.strptime(info["timestamp"], "%Y-%m-%d %H:%M:%S")).days
-                    if time_diff_days > 7:
-                        continue
-                except:
-                    pass
+                # Check if version is within last 7 days
+                timestamp = info.get("timestamp")
+                if timestamp and timestamp <= week_cutoff:
+                    continue
 
             if filter_option == "My Versions" and info.get("username", "") != self.username:
                 continue
@@ -758,13 +755,8 @@ class RestorePage:
         self.empty_message.place_forget()
         self.version_tree.grid()
 
-        # Sort versions by timestamp (newest first)
-        sorted_versions = sorted(
-            versions_data,
-            key=lambda x: datetime.strptime(x[1]["timestamp"], "%Y-%m-%d %H:%M:%S") 
-                if "timestamp" in x[1] else datetime.min,
-            reverse=True
-        )
+        # Sort versions by timestamp (newest first); the fixed-width strings sort chronologically
+        sorted_versions = sorted(versions_data, key=lambda x: x[1].get("timestamp", ""), reverse=True)
 
         # Split into available and unavailable versions
         available_versions = []
@@ -783,11 +775,7 @@ class RestorePage:
         display_versions = available_versions + unavailable_versions
 
         # Insert versions into tree (keeping sort by timestamp)
-        display_versions.sort(
-            key=lambda x: datetime.strptime(x[1]["timestamp"], "%Y-%m-%d %H:%M:%S") 
-                if "timestamp" in x[1] else datetime.min,
-            reverse=True
-        )
+        display_versions.sort(key=lambda x: x[1].get("timestamp", ""), reverse=True)
 
         # Insert versions into tree
         for i, (version_hash, info) in enumerate(display_versions):
@@ -1152,36 +1140,14 @@ class RestorePage:
 
                             # Completely remove and re-add the file to monitoring
                             normalized_path = os.path.normpath(self.selected_file)
-                            with file_monitor.lock:
-                                # First remove from all tracking collections
-                                if normalized_path in file_monitor.restoring_files:
-                                    file_monitor.restoring_files.remove(normalized_path)
-                                if normalized_path in file_monitor.watched_files:
-                                    file_monitor.watched_files.pop(normalized_path)
-
-                                # Add as a completely new file with fresh state
-                                if os.path.exists(normalized_path):
-                                    try:
-                                        current_hash = calculate_file_hash(normalized_path)
-                                        current_mtime = os.path.getmtime(normalized_path)
-                                        current_size = os.path.getsize(normalized_path)
-
-                                        file_monitor.watched_files[normalized_path] = {
-                                            'hash': current_hash,
-                                            'mtime': current_mtime,
-                                            'last_check': time.time(),
-                                            'is_open': False,  # File is closed after restore
-                                            'size': current_size
-                                        }
-
-                                        file_monitor.active_files.add(normalized_path)
-
-                                        # Log with current time and username
-                                        times = get_current_times()
-                                        print(f"[{times['utc']}] [{self.username}] *** FORCED RESET of file monitoring after restore: {normalized_path} ***")
-                                    except Exception as e:
-                                        times = get_current_times()
-                                        print(f"[{times['utc']}] [{self.username}] Error during forced reset: {str(e)}")
+                            try:
+                                if file_monitor.reset_after_restore(normalized_path):
+                                    # Log with current time and username
+                                    times = get_current_times()
+                                    print(f"[{times['utc']}] [{self.username}] *** FORCED RESET of file monitoring after restore: {normalized_path} ***")
+                            except Exception as e:
+                                times = get_current_times()
+                                print(f"[{times['utc']}] [{self.username}] Error during forced reset: {str(e)}")
 
                         # Hide progress and show success on main thread
                         self.parent.after(0, lambda: (
@@ -5,11 +5,22 @@ import shutil
 import hashlib
 from typing import Dict, Any
 
+# Read size for streaming file contents through the hash
+HASH_CHUNK_SIZE = 1024 * 1024
+
 def calculate_file_hash(file_path: str) -> str:
-    """Calculate SHA-256 hash of file contents."""
+    """Calculate SHA-256 hash of file contents, reading in fixed-size chunks."""
     try:
-        with open(file_path, 'rb') as f:
-            return hashlib.sha256(f.read()).hexdigest()
+        hasher = hashlib.sha256()
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buffer)
+        with open(file_path, 'rb', buffering=0) as f:
+            while True:
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                hasher.update(view[:count])
+        return hasher.hexdigest()
     except Exception as e:
         print(f"Failed to calculate file hash: {str(e)}")
         raise